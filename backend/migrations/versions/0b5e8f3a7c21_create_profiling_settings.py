@@ -0,0 +1,35 @@
+"""Create profiling_settings table
+
+Revision ID: 0b5e8f3a7c21
+Revises: f4a7d2c8e163
+Create Date: 2026-10-19 17:12:31.558204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0b5e8f3a7c21'
+down_revision: Union[str, Sequence[str], None] = 'f4a7d2c8e163'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Runtime profiling mode/rate shared by the web processes and the worker
+    op.create_table(
+        'profiling_settings',
+        sa.Column('id', sa.Integer, primary_key=True),
+        sa.Column('mode', sa.String, nullable=False),
+        sa.Column('rate', sa.Float, nullable=False),
+        sa.Column('updated_at', sa.DateTime, nullable=False)
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('profiling_settings')
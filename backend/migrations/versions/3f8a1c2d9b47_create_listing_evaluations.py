@@ -0,0 +1,38 @@
+"""Create listing_evaluations table
+
+Revision ID: 3f8a1c2d9b47
+Revises: 67c92525e264
+Create Date: 2026-10-19 09:12:41.518204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f8a1c2d9b47'
+down_revision: Union[str, Sequence[str], None] = '67c92525e264'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Per-listing evaluation memo used by incremental scanning
+    op.create_table(
+        'listing_evaluations',
+        sa.Column('item_id', sa.String, primary_key=True),
+        sa.Column('price', sa.Float, nullable=False),
+        sa.Column('comp_avg', sa.Float, nullable=False),
+        sa.Column('comp_count', sa.Integer, nullable=False),
+        sa.Column('undervalued', sa.Boolean, nullable=False),
+        sa.Column('end_time', sa.DateTime, nullable=True),
+        sa.Column('comps_checked_at', sa.DateTime, nullable=False)
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('listing_evaluations')
@@ -0,0 +1,40 @@
+"""Create watch_rules table
+
+Revision ID: a6d4e2b7c913
+Revises: 3f8a1c2d9b47
+Create Date: 2026-10-19 11:40:07.284519
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a6d4e2b7c913'
+down_revision: Union[str, Sequence[str], None] = '3f8a1c2d9b47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # User-defined watch rules matched against every scan
+    op.create_table(
+        'watch_rules',
+        sa.Column('id', sa.Integer, primary_key=True),
+        sa.Column('name', sa.String, nullable=False),
+        sa.Column('keywords', sa.String, nullable=True),
+        sa.Column('category_id', sa.String, nullable=True),
+        sa.Column('max_price', sa.Float, nullable=True),
+        sa.Column('ratio', sa.Float, nullable=True),
+        sa.Column('condition', sa.String, nullable=True),
+        sa.Column('enabled', sa.Boolean, nullable=False, server_default=sa.true()),
+        sa.Column('updated_at', sa.DateTime, nullable=False)
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('watch_rules')
@@ -0,0 +1,57 @@
+"""Add indexes for hot tracked_items and listing_evaluations queries
+
+Revision ID: c2e7f05a8d61
+Revises: a6d4e2b7c913
+Create Date: 2026-10-19 14:03:55.902316
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c2e7f05a8d61'
+down_revision: Union[str, Sequence[str], None] = 'a6d4e2b7c913'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (name, table, columns, partial-index predicate)
+INDEXES = [
+    # Ending-soon window and the listings page, both ordered by end_time
+    ('ix_tracked_items_end_time', 'tracked_items', ['end_time'], None),
+    # Category browsing, ordered by end_time within a category
+    ('ix_tracked_items_category_id_end_time', 'tracked_items', ['category_id', 'end_time'], None),
+    # Stale re-checks and incremental exports by watermark
+    ('ix_tracked_items_last_checked', 'tracked_items', ['last_checked'], None),
+    # Product identifiers are mostly NULL, so only index the rows that have one
+    ('ix_tracked_items_upc', 'tracked_items', ['upc'], 'upc IS NOT NULL'),
+    ('ix_tracked_items_ean', 'tracked_items', ['ean'], 'ean IS NOT NULL'),
+    ('ix_tracked_items_gtin', 'tracked_items', ['gtin'], 'gtin IS NOT NULL'),
+    # Memo expiry and incremental exports of listing_evaluations
+    ('ix_listing_evaluations_end_time', 'listing_evaluations', ['end_time'], None),
+    ('ix_listing_evaluations_comps_checked_at', 'listing_evaluations', ['comps_checked_at'], None),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY avoids locking a large tracked_items table against writes,
+    # but can't run inside a transaction
+    with op.get_context().autocommit_block():
+        for name, table, columns, where in INDEXES:
+            op.create_index(
+                name, table, columns,
+                postgresql_concurrently=True,
+                postgresql_where=sa.text(where) if where else None,
+                if_not_exists=True
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
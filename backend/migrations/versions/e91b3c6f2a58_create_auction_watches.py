@@ -0,0 +1,42 @@
+"""Create auction_watches table
+
+Revision ID: e91b3c6f2a58
+Revises: c2e7f05a8d61
+Create Date: 2026-10-19 15:02:44.613207
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e91b3c6f2a58'
+down_revision: Union[str, Sequence[str], None] = 'c2e7f05a8d61'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Mirror of the in-memory endgame queue: auctions awaiting last-minute re-checks
+    op.create_table(
+        'auction_watches',
+        sa.Column('item_id', sa.String, primary_key=True),
+        sa.Column('title', sa.String, nullable=False),
+        sa.Column('url', sa.String, nullable=True),
+        sa.Column('category_id', sa.String, nullable=True),
+        sa.Column('condition', sa.String, nullable=True),
+        sa.Column('price', sa.Float, nullable=False),
+        sa.Column('comp_avg', sa.Float, nullable=False),
+        sa.Column('comp_count', sa.Integer, nullable=False),
+        sa.Column('end_time', sa.DateTime, nullable=False)
+    )
+    op.create_index('ix_auction_watches_end_time', 'auction_watches', ['end_time'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_auction_watches_end_time', table_name='auction_watches')
+    op.drop_table('auction_watches')
@@ -0,0 +1,34 @@
+"""Add listing_evaluations.updated_at
+
+Revision ID: f4a7d2c8e163
+Revises: e91b3c6f2a58
+Create Date: 2026-10-19 16:21:08.407735
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f4a7d2c8e163'
+down_revision: Union[str, Sequence[str], None] = 'e91b3c6f2a58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Bumped on every change to an evaluation (price included), unlike
+    # comps_checked_at, so it works as the incremental export watermark
+    op.add_column('listing_evaluations', sa.Column('updated_at', sa.DateTime, nullable=True))
+    op.execute("UPDATE listing_evaluations SET updated_at = comps_checked_at")
+    op.alter_column('listing_evaluations', 'updated_at', nullable=False)
+    op.create_index('ix_listing_evaluations_updated_at', 'listing_evaluations', ['updated_at'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_listing_evaluations_updated_at', table_name='listing_evaluations')
+    op.drop_column('listing_evaluations', 'updated_at')
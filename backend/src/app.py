@@ -1,67 +1,372 @@
 # app.py
-from flask import Flask, render_template_string, request, render_template, redirect
-from apscheduler.schedulers.background import BackgroundScheduler
-from .config import Config
-from .scout import search_ebay, check_all_tracked_items, search_ending_soon, is_undervalued
-from flask_sqlalchemy import SQLAlchemy
-from ebaysdk.finding import Connection as Finding
+if __name__ == "__main__":
+    # Run as a script: load .env before src.config is imported below
+    from .env import load_env
+    load_env()
+from flask import Blueprint, Flask, Response, request, render_template, redirect, g, send_file, stream_with_context
+from . import config
+from .models import db, TrackedItem, ListingEvaluation, WatchRule, AuctionWatch, ProfilingSettings
+from .scout import search_ending_soon, evaluate_listings, item_price, item_url, current_prices, score, sdk_execute
+from .evaluation_memo import EvaluationMemo, MemoEntry
+from .endgame import AuctionQueue, Candidate
+from .watchlist import RuleError, RuleIndex, make_rule
+from .export import FORMATS, Export, ExportError, export_command, parse_watermark
+from . import profiling
+from .profiling import span
+from datetime import datetime, timezone
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 import logging
 import os
-from dotenv import load_dotenv
-
-load_dotenv()
+import tempfile
+import threading
+import time
 
-app = Flask(__name__)
+# Nothing here connects to the DB, talks to eBay or starts threads at import
+# time; create_app() wires things up and the scheduler only runs when asked.
+bp = Blueprint('main', __name__)
 alerts = []
+# Alerts from the last poll and from endgame re-checks (by item id, kept until
+# the auction ends); publish_alerts() combines them into `alerts`
+_scan_alerts = []
+_endgame_alerts = {}
+_alerts_lock = threading.Lock()
+scheduler = None
+_finding = threading.local()
+
+def database_uri():
+    return f"postgresql+psycopg://{os.getenv('DB_USER')}:{os.getenv('DB_PASSWORD')}@{os.getenv('DB_HOST')}/{os.getenv('DB_NAME')}"
+
+def get_finding():
+    # ebaysdk connections keep per-call state, so each thread builds its own on first use
+    if not hasattr(_finding, 'api'):
+        from ebaysdk.finding import Connection as Finding
+        _finding.api = Finding(appid=config.APP_ID, config_file=None)
+    return _finding.api
+
+evaluation_memo = None
+endgame_queue = None
+watch_rules = None
+_watch_rules_version = None
+
+def _naive(value):
+    return value.replace(tzinfo=None) if value is not None and value.tzinfo else value
+
+def load_evaluation_memo():
+    memo = EvaluationMemo()
+    with span("db"):
+        memo.load(MemoEntry(r.item_id, r.price, r.comp_avg, r.comp_count, r.undervalued, r.end_time, r.comps_checked_at,
+                            r.updated_at)
+                  for r in ListingEvaluation.query.all())
+    memo.expire()
+    logging.debug(f"Loaded {len(memo)} listing evaluations")
+    return memo
+
+UPSERT_BATCH_SIZE = 1000  # Rows per INSERT ... ON CONFLICT, well under Postgres' bind parameter limit
+
+def upsert(model, rows):
+    """Insert or update rows (dicts keyed by column name) by primary key, in batched statements."""
+    key = [c.name for c in model.__table__.primary_key]
+    for start in range(0, len(rows), UPSERT_BATCH_SIZE):
+        stmt = pg_insert(model).values(rows[start:start + UPSERT_BATCH_SIZE])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=key, set_={name: stmt.excluded[name] for name in rows[0] if name not in key})
+        db.session.execute(stmt)
+
+def save_evaluation_memo(memo):
+    changed, expired = memo.drain()
+    with span("db"):
+        upsert(ListingEvaluation, [
+            dict(entry._asdict(), end_time=_naive(entry.end_time), comps_checked_at=_naive(entry.comps_checked_at),
+                 updated_at=_naive(entry.updated_at))
+            for entry in changed])
+        if expired:
+            ListingEvaluation.query.filter(ListingEvaluation.item_id.in_(expired)).delete(synchronize_session=False)
+        db.session.commit()
+    logging.debug(f"Saved {len(changed)} listing evaluations, expired {len(expired)}")
+
+def load_watch_rules():
+    """Return the compiled watch rule index, rebuilding it only when the rules table has changed."""
+    global watch_rules, _watch_rules_version
+    with span("db"):
+        version = db.session.query(db.func.count(WatchRule.id), db.func.max(WatchRule.updated_at)).one()
+        if watch_rules is None or tuple(version) != _watch_rules_version:
+            rules = []
+            for r in WatchRule.query.filter_by(enabled=True).all():
+                try:
+                    rules.append(make_rule(r.id, r.name, r.keywords, r.category_id, r.max_price, r.ratio, r.condition))
+                except RuleError as e:
+                    # Rows saved before validation existed; skip rather than alert on everything
+                    logging.warning(f"Skipping watch rule {r.id}: {e}")
+            watch_rules = RuleIndex(rules)
+            _watch_rules_version = tuple(version)
+            logging.info(f"Compiled {watch_rules.size} watch rules")
+    return watch_rules
+
+def get_endgame_queue(app):
+    """Start the last-minute re-check queue on first use, restoring it from auction_watches."""
+    global endgame_queue
+    if endgame_queue is None and config.ENDGAME_OFFSETS:
+        if config.FIXTURE_MODE == "offline":
+            # Re-checks use the Shopping API and OAuth, which aren't recorded
+            logging.info("Endgame re-checks are disabled in offline fixture mode")
+            return None
+        endgame_queue = AuctionQueue(lambda candidates, offset: recheck_auctions(app, candidates, offset))
+        with span("db"):
+            endgame_queue.load(Candidate(r.item_id, r.title, r.url, r.category_id, r.condition, r.price, r.comp_avg,
+                                         r.comp_count, r.end_time) for r in AuctionWatch.query.all())
+        logging.debug(f"Loaded {len(endgame_queue)} auction watches")
+        endgame_queue.start()
+    return endgame_queue
+
+def save_endgame_queue(queue):
+    changed, removed = queue.drain()
+    with span("db"):
+        upsert(AuctionWatch, [dict(c._asdict(), end_time=_naive(c.end_time)) for c in changed])
+        if removed:
+            AuctionWatch.query.filter(AuctionWatch.item_id.in_(removed)).delete(synchronize_session=False)
+        db.session.commit()
+    logging.debug(f"Saved {len(changed)} auction watches, removed {len(removed)}")
+
+def recheck_auctions(app, candidates, offset):
+    """Re-price and re-score auctions about to end; called from the endgame queue's thread."""
+    with app.app_context(), profiling.profile("endgame"):
+        prices = current_prices(c.item_id for c in candidates)
+        rules = load_watch_rules()
+        updated = []
+        for c in candidates:
+            if c.item_id not in prices:
+                continue
+            c = c._replace(price=prices[c.item_id])
+            updated.append(c)
+            flag = score(c.price, c.comp_avg)
+            matched = rules.match(c.title, c.category_id, c.condition, c.price, c.comp_avg)
+            alert = {
+                "title": c.title,
+                "price": c.price,
+                "url": c.url,
+                "undervalued": flag,
+                "rules": [rule.name for rule in matched],
+                "endgame": f"T-{offset:g}s",
+                "end_time": c.end_time
+            } if flag or matched else None
+            publish_alerts(endgame={c.item_id: alert})
+        logging.debug(f"Endgame T-{offset:g}s: re-checked {len(updated)} of {len(candidates)} auctions")
+        return updated
+
+def publish_alerts(scan=None, endgame=None):
+    """Replace the poll's alerts and/or update endgame alerts (None clears one), then rebuild `alerts`."""
+    global alerts, _scan_alerts
+    with _alerts_lock:
+        if scan is not None:
+            _scan_alerts = scan
+        for item_id, alert in (endgame or {}).items():
+            if alert is None:
+                _endgame_alerts.pop(item_id, None)
+            else:
+                _endgame_alerts[item_id] = alert
+        now = datetime.now(timezone.utc)
+        for item_id in [i for i, a in _endgame_alerts.items() if a["end_time"] <= now]:
+            del _endgame_alerts[item_id]
+        alerts = _scan_alerts + list(_endgame_alerts.values())
+
+PROFILING_SYNC_SECONDS = 30  # How stale a web process's copy of the profiling settings may get
+_profiling_synced_at = 0.0
+
+def sync_profiling_settings(force=False):
+    """Pick up the settings saved by /admin/profiling, which may have been handled by another process."""
+    global _profiling_synced_at
+    if not force and time.monotonic() - _profiling_synced_at < PROFILING_SYNC_SECONDS:
+        return
+    _profiling_synced_at = time.monotonic()
+    with span("db"):
+        row = db.session.get(ProfilingSettings, 1)
+    if row is not None:
+        profiling.settings.update(mode=row.mode, rate=row.rate)
+
+def poll_ebay(app):
+    with app.app_context():
+        # The worker is a separate process, so it reads the settings every cycle
+        sync_profiling_settings(force=True)
+        with profiling.profile("scan"):
+            _poll_ebay(get_endgame_queue(app))
 
-# Configure SQLAlchemy
-app.config['SQLALCHEMY_DATABASE_URI'] = f"postgresql+psycopg2://{os.getenv('DB_USER')}:{os.getenv('DB_PASSWORD')}@{os.getenv('DB_HOST')}/{os.getenv('DB_NAME')}"
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-
-# Configure logging
-logging.basicConfig(level=logging.DEBUG)
-
-db = SQLAlchemy(app)
-
-# Define models
-class TrackedItem(db.Model):
-    __tablename__ = 'tracked_items'
-    id = db.Column(db.String, primary_key=True)
-    title = db.Column(db.String, nullable=False)
-    current_price = db.Column(db.Float, nullable=False)
-    end_time = db.Column(db.DateTime, nullable=False)
-    upc = db.Column(db.String, nullable=True)
-    ean = db.Column(db.String, nullable=True)
-    gtin = db.Column(db.String, nullable=True)
-    category_id = db.Column(db.String, nullable=True)
-    last_checked = db.Column(db.DateTime, nullable=False)
-
-class BuyItNowAverage(db.Model):
-    __tablename__ = 'buy_it_now_averages'
-    item_type = db.Column(db.String, primary_key=True)
-    average_price = db.Column(db.Float, nullable=False)
-    updated_at = db.Column(db.DateTime, nullable=False)
-
-def poll_ebay():
-    global alerts
+def _poll_ebay(endgame=None):
+    global evaluation_memo
     new = []
-    for item in search_ending_soon():
-        if is_undervalued(item):
-            new.append({
-                "title": item.title,
-                "price": item.price.value,
-                "url": item.item_web_url
-            })
-    alerts = new  # simple overwrite; you can append/dedupe instead
-
-scheduler = BackgroundScheduler()
-scheduler.add_job(poll_ebay, "interval", minutes=5)
-scheduler.start()
-
-# Replace with your eBay API credentials
-EBAY_APP_ID = os.getenv('EBAY_APP_ID')
-
-@app.route('/', methods=['GET', 'POST'])
+    memo = None
+    if config.INCREMENTAL_SCAN:
+        if evaluation_memo is None:
+            evaluation_memo = load_evaluation_memo()
+        memo = evaluation_memo
+        memo.expire()
+    rules = load_watch_rules()
+    if config.ASYNC_SCAN:
+        # aiohttp is only imported by processes that actually run the async pipeline
+        from .async_scout import run_scan
+        results = run_scan(memo=memo, rules=rules, endgame=endgame)
+    else:
+        results = evaluate_listings(search_ending_soon(), memo, rules=rules, endgame=endgame)
+    if memo is not None:
+        logging.debug(f"Evaluation memo: {memo.hits} hits, {memo.misses} misses")
+        save_evaluation_memo(memo)
+    if endgame is not None:
+        save_endgame_queue(endgame)
+    for result in results:
+        new.append({
+            "title": result.item.title,
+            "price": item_price(result.item),
+            "url": item_url(result.item),
+            "undervalued": result.undervalued,
+            "rules": [rule.name for rule in result.rules]
+        })
+    publish_alerts(scan=new)
+
+def start_scheduler(app):
+    """Start polling eBay in a background thread. Only the process role that scans should call this."""
+    global scheduler
+    if scheduler is None:
+        from apscheduler.schedulers.background import BackgroundScheduler
+        scheduler = BackgroundScheduler()
+        scheduler.add_job(poll_ebay, "interval", minutes=5, args=[app])
+        scheduler.start()
+    return scheduler
+
+def create_app(run_scheduler=None):
+    # .env is loaded by the entry point (src.wsgi, src.worker) before config is imported
+    app = Flask(__name__, template_folder=os.path.join(os.path.dirname(__file__), '..', 'templates'))
+
+    # Configure SQLAlchemy; the engine doesn't connect until the first query
+    app.config['SQLALCHEMY_DATABASE_URI'] = database_uri()
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+
+    # Configure logging
+    logging.basicConfig(level=logging.DEBUG)
+
+    app.register_blueprint(bp)
+    app.cli.add_command(export_command)
+
+    # Web processes follow RUN_SCHEDULER; the worker and CLI commands such as
+    # `flask export` pass run_scheduler=False
+    if config.RUN_SCHEDULER if run_scheduler is None else run_scheduler:
+        start_scheduler(app)
+    return app
+
+@bp.route('/health')
+def health():
+    return {'status': 'ok'}
+
+@bp.before_app_request
+def start_request_profile():
+    if config.PROFILE_REQUESTS and request.endpoint not in ('main.admin_profiling', 'main.health'):
+        sync_profiling_settings()
+        g.profile = profiling.profile(f"request-{request.endpoint or 'unknown'}")
+        g.profile.__enter__()
+
+@bp.teardown_app_request
+def finish_request_profile(exc):
+    profile = g.pop('profile', None)
+    if profile is not None:
+        profile.__exit__(None, None, None)
+
+@bp.route('/admin/profiling', methods=['GET', 'POST'])
+def admin_profiling():
+    # Disabled unless ADMIN_TOKEN is configured
+    if not config.ADMIN_TOKEN or request.headers.get('X-Admin-Token') != config.ADMIN_TOKEN:
+        return {'error': 'Forbidden'}, 403
+    if request.method == 'POST':
+        body = request.get_json(silent=True) or {}
+        mode = body.get('mode', profiling.settings['mode'])
+        if mode and mode not in profiling.MODES:
+            return {'error': f"mode must be one of {list(profiling.MODES)} or empty"}, 400
+        try:
+            rate = float(body.get('rate', profiling.settings['rate']))
+        except (TypeError, ValueError):
+            return {'error': 'rate must be a number'}, 400
+        profiling.settings.update(mode=mode, rate=min(max(rate, 0.0), 1.0))
+        # Saved to the DB so the worker's scans and the other web processes follow too
+        db.session.merge(ProfilingSettings(id=1, updated_at=datetime.utcnow(), **profiling.settings))
+        db.session.commit()
+        logging.info(f"Profiling settings changed: {profiling.settings}")
+    else:
+        sync_profiling_settings(force=True)
+    return dict(profiling.settings, output_dir=config.PROFILE_DIR)
+
+def _watch_rule_dict(rule):
+    return {
+        'id': rule.id, 'name': rule.name, 'keywords': rule.keywords, 'category_id': rule.category_id,
+        'max_price': rule.max_price, 'ratio': rule.ratio, 'condition': rule.condition, 'enabled': rule.enabled
+    }
+
+@bp.route('/watch_rules', methods=['GET', 'POST'])
+def watch_rules_view():
+    if request.method == 'POST':
+        body = request.get_json(silent=True) or {}
+        if not body.get('name'):
+            return {'error': 'name is required'}, 400
+        enabled = body.get('enabled', True)
+        if not isinstance(enabled, bool):
+            return {'error': 'enabled must be true or false'}, 400
+        try:
+            rule = WatchRule(
+                name=body['name'],
+                keywords=body.get('keywords'),
+                category_id=body.get('category_id'),
+                max_price=float(body['max_price']) if body.get('max_price') is not None else None,
+                ratio=float(body['ratio']) if body.get('ratio') is not None else None,
+                condition=body.get('condition'),
+                enabled=enabled,
+                updated_at=datetime.utcnow()
+            )
+        except (TypeError, ValueError):
+            return {'error': 'max_price and ratio must be numbers'}, 400
+        try:
+            make_rule(None, rule.name, rule.keywords, rule.category_id, rule.max_price, rule.ratio, rule.condition)
+        except RuleError as e:
+            return {'error': str(e)}, 400
+        db.session.add(rule)
+        db.session.commit()
+        logging.debug(f"Watch rule added: {rule.name}")
+        return _watch_rule_dict(rule), 201
+    return {'rules': [_watch_rule_dict(r) for r in WatchRule.query.order_by(WatchRule.id).all()]}
+
+@bp.route('/watch_rules/<int:rule_id>', methods=['DELETE'])
+def delete_watch_rule(rule_id):
+    rule = db.session.get(WatchRule, rule_id)
+    if rule is None:
+        return {'error': 'Not found'}, 404
+    db.session.delete(rule)
+    db.session.commit()
+    return {'deleted': rule_id}
+
+@bp.route('/export/<table>', methods=['GET'])
+def export_table(table):
+    # Exports dump whole tables, so they sit behind the admin token too
+    if not config.ADMIN_TOKEN or request.headers.get('X-Admin-Token') != config.ADMIN_TOKEN:
+        return {'error': 'Forbidden'}, 403
+    fmt = request.args.get('format', 'csv.gz')
+    # Checked before Export() so a bad request doesn't cost a DB query
+    if fmt not in FORMATS:
+        return {'error': "format must be 'csv.gz' or 'parquet'"}, 400
+    try:
+        export = Export(table, parse_watermark(request.args.get('since')))
+        stamp = f"{export.watermark:%Y%m%dT%H%M%S}" if export.watermark else 'empty'
+        headers = {'X-Export-Watermark': export.watermark.isoformat() if export.watermark else ''}
+        if fmt == 'parquet':
+            # Parquet's footer is written last, so spool it to a temp file before sending
+            spool = tempfile.TemporaryFile()
+            export.write_parquet(spool)
+            spool.seek(0)
+            response = send_file(spool, mimetype='application/vnd.apache.parquet',
+                                 as_attachment=True, download_name=f"{table}-{stamp}.parquet")
+            response.headers.update(headers)
+            return response
+    except ExportError as e:
+        return {'error': str(e)}, 400
+    headers['Content-Disposition'] = f'attachment; filename="{table}-{stamp}.csv.gz"'
+    return Response(stream_with_context(export.iter_csv_gz()), mimetype='application/gzip', headers=headers)
+
+@bp.route('/', methods=['GET', 'POST'])
 def home():
     if request.method == 'POST':
         # Handle both form data and JSON
@@ -71,8 +376,8 @@ def home():
         if query:
             try:
                 # Connect to eBay API
-                api = Finding(appid=EBAY_APP_ID, config_file=None)
-                response = api.execute('findItemsByKeywords', {'keywords': query})
+                api = get_finding()
+                response = sdk_execute(api, 'findItemsByKeywords', {'keywords': query})
                 items = response.reply.searchResult.item
                 logging.debug(f"eBay API response: {items}")
 
@@ -97,21 +402,21 @@ def home():
 
     return render_template('index.html', results=[])
 
-@app.route('/listings', methods=['GET'])
+@bp.route('/listings', methods=['GET'])
 def listings():
-    # Fetch all tracked items from the database
-    tracked_items = TrackedItem.query.all()
+    # Fetch all tracked items from the database, soonest-ending first
+    tracked_items = TrackedItem.query.order_by(TrackedItem.end_time).all()
     return render_template('listings.html', tracked_items=tracked_items)
 
-@app.route('/add_to_tracking', methods=['POST'])
+@bp.route('/add_to_tracking', methods=['POST'])
 def add_to_tracking():
     item_id = request.form.get('item_id')
     logging.debug(f"Item ID to track: {item_id}")
 
     try:
         # Fetch item details from eBay API
-        api = Finding(appid=EBAY_APP_ID, config_file=None)
-        response = api.execute('findItemsByItemID', {'itemID': item_id})
+        api = get_finding()
+        response = sdk_execute(api, 'findItemsByItemID', {'itemID': item_id})
         item = response.reply.item[0]
 
         # Extract relevant details
@@ -132,6 +437,7 @@ def add_to_tracking():
         return redirect('/', error="Failed to add item to tracking.")
 
 if __name__ == "__main__":
+    app = create_app()
     with app.app_context():
         db.create_all()
     app.run(debug=True)
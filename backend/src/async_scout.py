@@ -0,0 +1,161 @@
+# async_scout.py
+# asyncio version of the scan pipeline in scout.py.
+#
+# All Finding calls share one aiohttp session (and so one keep-alive
+# connection pool) and run on a single event loop thread. A semaphore caps how
+# many requests are in flight at once, so a cycle can have hundreds of comp
+# lookups outstanding without a thread per request. run_scan() is the sync
+# entry point for APScheduler and the worker.
+if __name__ == "__main__":
+    # Run as a script: load .env before src.config is imported below
+    from .env import load_env
+    load_env()
+import asyncio
+import traceback
+
+import aiohttp
+
+from . import config
+from . import replay
+from . import resilience
+from .finding_decoder import FINDING_PATH, FindingError, build_params, parse
+from .profiling import span
+from .replay import FixtureMissing
+from .resilience import ResilienceError
+from .scout import completed_payload, ending_soon_payload, evaluate, score, stats_from
+
+
+RETRYABLE = (aiohttp.ClientConnectionError, asyncio.TimeoutError, resilience.ServerError)
+
+
+class Scanner:
+    def __init__(self, session, concurrency=None, response_format=None):
+        self.session = session
+        self.semaphore = asyncio.Semaphore(concurrency or config.SCAN_CONCURRENCY)
+        self.response_format = response_format or config.RESPONSE_FORMAT
+        self.url = f"https://{config.FINDING_DOMAIN}{FINDING_PATH}"
+        # One comp lookup per distinct title per cycle
+        self._comps = {}
+
+    async def _fetch_once(self, params, timeout):
+        with span("ebay"):
+            async with self.session.get(self.url, params=params, timeout=aiohttp.ClientTimeout(total=timeout)) as resp:
+                if resp.status >= 500:
+                    raise resilience.ServerError(f"Finding API returned HTTP {resp.status}")
+                resp.raise_for_status()
+                return await resp.read()
+
+    async def fetch(self, call, payload, hedge=False):
+        store = replay.get_store()
+        if store is not None:
+            body = store.lookup(call, payload, self.response_format)
+            if body is not None:
+                return body
+        params = {k: str(v) for k, v in build_params(call, payload, self.response_format).items()}
+
+        async def request():
+            # Take a concurrency slot before the deadline starts, so time queued
+            # behind SCAN_CONCURRENCY never shows up as an eBay timeout
+            async with self.semaphore:
+                return await resilience.async_call(lambda remaining: self._fetch_once(params, remaining),
+                                                   retry_on=RETRYABLE, breaker=resilience.get_breaker("finding"))
+        body = await (resilience.async_hedged(request) if hedge else request())
+        if store is not None:
+            store.record(call, payload, self.response_format, body)
+        return body
+
+    async def find_items(self, call, payload, pages=1, hedge=False):
+        """Fetch the first page, then any further pages concurrently."""
+        def page_payload(page):
+            return dict(payload, paginationInput=dict(payload.get("paginationInput", {}), pageNumber=page))
+
+        listings, total_pages = parse(await self.fetch(call, page_payload(1), hedge), call, self.response_format)
+        last = min(pages, total_pages)
+        if last > 1:
+            bodies = await asyncio.gather(*(self.fetch(call, page_payload(p), hedge) for p in range(2, last + 1)))
+            for body in bodies:
+                listings.extend(parse(body, call, self.response_format)[0])
+        return listings
+
+    async def search_ending_soon(self, limit=25, pages=1):
+        try:
+            return await self.find_items("findItemsAdvanced", ending_soon_payload(limit), pages)
+        except (aiohttp.ClientError, asyncio.TimeoutError, FindingError, FixtureMissing, ResilienceError) as e:
+            print("Finding API error:", e)
+            return []
+
+    async def _search_completed(self, title, limit):
+        try:
+            items = await self.find_items("findCompletedItems", completed_payload(title, limit), hedge=True)
+            return [i.price for i in items if i.price is not None]
+        except (aiohttp.ClientError, asyncio.TimeoutError, FindingError, FixtureMissing, ResilienceError) as e:
+            # None, not []: a failed lookup mustn't be memoized as "no comps"
+            print("Finding API error:", e)
+            return None
+
+    async def search_completed(self, title, limit=25):
+        key = (title, limit)
+        if key not in self._comps:
+            self._comps[key] = asyncio.ensure_future(self._search_completed(title, limit))
+        return await self._comps[key]
+
+    async def comp_stats(self, title):
+        return stats_from(await self.search_completed(title))
+
+    async def is_undervalued(self, item, ratio=config.UNDERVALUE_RATIO):
+        avg, _ = await self.comp_stats(item.title) or (0, 0)
+        return score(item.price, avg, ratio)
+
+    async def evaluate(self, item, memo=None, ratio=config.UNDERVALUE_RATIO, rules=None, endgame=None):
+        stats = memo.comps(item.item_id) if memo is not None else None
+        cached = stats is not None
+        if not cached:
+            stats = await self.comp_stats(item.title)
+        return evaluate(item, stats, cached, memo, ratio, rules, endgame)
+
+    async def scan(self, limit=100, pages=None, ratio=config.UNDERVALUE_RATIO, memo=None, rules=None, budget=None,
+                   endgame=None):
+        """Return Evaluations for the ending-soon listings worth alerting on.
+
+        Evaluations still outstanding after `budget` seconds (default
+        SCAN_CYCLE_BUDGET) are cancelled and picked up next cycle.
+        """
+        deadline = resilience.Deadline(config.SCAN_CYCLE_BUDGET if budget is None else budget)
+        items = await self.search_ending_soon(limit, pages or config.SCAN_PAGES)
+        if not items:
+            return []
+        tasks = [asyncio.ensure_future(self.evaluate(item, memo, ratio, rules, endgame)) for item in items]
+        done, pending = await asyncio.wait(tasks, timeout=deadline.remaining())
+        for task in pending:
+            task.cancel()
+        if pending:
+            print(f"Scan budget used up, skipped {len(pending)} listings")
+        failed = [t for t in tasks if t in done and t.exception() is not None]
+        if failed:
+            print(f"Evaluation failed for {len(failed)} listings, first error:")
+            traceback.print_exception(failed[0].exception())
+        results = [t.result() for t in tasks if t in done and t.exception() is None]
+        return [r for r in results if r.undervalued or r.rules]
+
+
+def open_session(concurrency=None):
+    connector = aiohttp.TCPConnector(limit=concurrency or config.SCAN_CONCURRENCY,
+                                     keepalive_timeout=config.HTTP_KEEPALIVE)
+    return aiohttp.ClientSession(connector=connector)
+
+
+async def scan(limit=100, pages=None, ratio=config.UNDERVALUE_RATIO, concurrency=None, memo=None, rules=None,
+               endgame=None):
+    async with open_session(concurrency) as session:
+        return await Scanner(session, concurrency).scan(limit, pages, ratio, memo, rules, endgame=endgame)
+
+
+def run_scan(limit=100, pages=None, ratio=config.UNDERVALUE_RATIO, concurrency=None, memo=None, rules=None,
+             endgame=None):
+    """Blocking wrapper around scan() for APScheduler jobs and the worker."""
+    return asyncio.run(scan(limit, pages, ratio, concurrency, memo, rules, endgame))
+
+
+if __name__ == "__main__":
+    for result in run_scan():
+        print(f"🔥 {result.item.title}: ${result.item.price} vs avg ${result.comp_avg:.2f}")
@@ -1,9 +1,8 @@
 # Configuration file for eBay Scanner
+#
+# Settings are read from the environment when this module is imported.
+# Importing it never touches .env: entry points load it first (see env.py).
 import os
-from dotenv import load_dotenv
-
-# Load environment variables from .env file
-load_dotenv()
 
 # eBay API credentials
 CLIENT_ID = os.getenv("EBAY_CLIENT_ID", "your_client_id_here")  # Replace with your actual Client ID
@@ -15,3 +14,54 @@ DEV_ID = os.getenv("EBAY_DEV_ID", "your_dev_id_here")  # Replace with your actua
 MARKETPLACE_ID = "EBAY_US"  # Default marketplace
 UNDERVALUE_RATIO = 0.6  # Notify if current price < 60% of average sold price
 CHECK_INTERVAL = 600  # Polling interval in seconds
+
+# Finding API transport
+FINDING_DOMAIN = os.getenv("EBAY_FINDING_DOMAIN", "svcs.sandbox.ebay.com")  # svcs.ebay.com for production
+RESPONSE_DECODER = os.getenv("EBAY_RESPONSE_DECODER", "ebaysdk")  # "ebaysdk" or "fast" (see finding_decoder.py)
+RESPONSE_FORMAT = os.getenv("EBAY_RESPONSE_FORMAT", "JSON")  # JSON or XML, used by the fast decoder
+
+# Record/replay of Finding API traffic (see replay.py)
+FIXTURE_MODE = os.getenv("EBAY_FIXTURE_MODE", "")  # "", "record", "replay" or "offline"
+FIXTURE_PATH = os.getenv("EBAY_FIXTURE_PATH", "finding_fixtures.sqlite3")
+
+# Async scan pipeline (see async_scout.py)
+ASYNC_SCAN = os.getenv("ASYNC_SCAN", "false").lower() == "true"
+SCAN_CONCURRENCY = int(os.getenv("SCAN_CONCURRENCY", "200"))  # Max in-flight Finding requests
+SCAN_PAGES = int(os.getenv("SCAN_PAGES", "1"))  # Pages of 100 ending-soon listings per cycle
+HTTP_KEEPALIVE = float(os.getenv("HTTP_KEEPALIVE", "30"))  # Seconds to keep idle connections open
+
+# Incremental scanning (see evaluation_memo.py)
+INCREMENTAL_SCAN = os.getenv("INCREMENTAL_SCAN", "true").lower() == "true"
+COMP_STATS_TTL = int(os.getenv("COMP_STATS_TTL", "1800"))  # Seconds before a listing's comp stats are refetched
+
+# Profiling (see profiling.py)
+PROFILE_MODE = os.getenv("PROFILE_MODE", "")  # "", "sample" or "cprofile"
+PROFILE_RATE = float(os.getenv("PROFILE_RATE", "0.05"))  # Fraction of scan cycles/requests to profile
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "10"))  # Stack sampling interval
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+PROFILE_REQUESTS = os.getenv("PROFILE_REQUESTS", "false").lower() == "true"  # Also trace Flask requests
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")  # Required for /admin endpoints; blank disables them
+
+# Process roles: only the worker (or a web process that opts in) polls eBay
+RUN_SCHEDULER = os.getenv("RUN_SCHEDULER", "false").lower() == "true"
+
+# Analytics export (see export.py)
+EXPORT_DATABASE_URI = os.getenv("EXPORT_DATABASE_URI", "")  # e.g. a read replica; blank uses the app database
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "5000"))  # Rows fetched per server-side cursor batch
+
+# Resilience for Finding calls (see resilience.py)
+EBAY_CALL_TIMEOUT = float(os.getenv("EBAY_CALL_TIMEOUT", "10"))  # Deadline per call, covering all retries
+EBAY_RETRIES = int(os.getenv("EBAY_RETRIES", "2"))
+EBAY_BACKOFF_BASE = float(os.getenv("EBAY_BACKOFF_BASE", "0.25"))  # Seconds; full-jitter exponential backoff
+BREAKER_FAILURES = int(os.getenv("BREAKER_FAILURES", "5"))  # Consecutive failures before failing fast
+BREAKER_RESET_SECONDS = float(os.getenv("BREAKER_RESET_SECONDS", "30"))
+HEDGE_AFTER_SECONDS = float(os.getenv("HEDGE_AFTER_SECONDS", "0"))  # Send a duplicate comp lookup after this long; 0 disables
+HEDGE_MAX_WORKERS = int(os.getenv("HEDGE_MAX_WORKERS", "8"))
+SCAN_CYCLE_BUDGET = float(os.getenv("SCAN_CYCLE_BUDGET", "240"))  # Seconds a poll may spend on comp lookups
+
+# Last-minute auction re-checks (see endgame.py)
+ENDGAME_OFFSETS = os.getenv("ENDGAME_OFFSETS", "")  # Seconds before the end to re-check, e.g. "120,30"; blank disables
+ENDGAME_MARGIN = float(os.getenv("ENDGAME_MARGIN", "1.25"))  # Queue listings priced up to this multiple of the deal threshold
+EBAY_OAUTH_URL = os.getenv("EBAY_OAUTH_URL", "https://api.sandbox.ebay.com/identity/v1/oauth2/token")  # api.ebay.com for production
+SHOPPING_DOMAIN = os.getenv("EBAY_SHOPPING_DOMAIN", "open.api.sandbox.ebay.com")  # open.api.ebay.com for production
+ENDGAME_TICK = float(os.getenv("ENDGAME_TICK", "1"))  # Timer wheel resolution in seconds
@@ -0,0 +1,221 @@
+# endgame.py
+# Last-minute re-checks for auctions that are about to close.
+#
+# A poll scores each listing once, so a listing that looks fine at T-9
+# minutes would never be looked at again before it ends. Listings that are
+# deals, or within ENDGAME_MARGIN of being one, are pushed onto an
+# AuctionQueue, a heap ordered by end time, and a timer is set for each of
+# ENDGAME_OFFSETS (e.g. 120 and 30 seconds before the end). The timers live in
+# a hashed timer wheel: scheduling and firing are O(1), and the queue's thread
+# sleeps until the next occupied slot instead of polling the marketplace. When
+# timers fire, the due listings are handed to the `check` callback in one batch
+# so it can fetch their current prices together and re-score them.
+#
+# Re-checks go through the Shopping API, which needs an OAuth application
+# token (see scout.app_token), so the feature is off until ENDGAME_OFFSETS is
+# set.
+#
+# Like evaluation_memo, this module is plain Python; app.py mirrors the queue
+# to the auction_watches table (via drain()) so it survives restarts.
+import heapq
+import logging
+import threading
+import time
+from collections import namedtuple
+
+from . import config
+from .evaluation_memo import utc
+
+Candidate = namedtuple("Candidate", [
+    "item_id", "title", "url", "category_id", "condition", "price", "comp_avg", "comp_count", "end_time",
+])
+
+
+def parse_offsets(value):
+    """"120,30" -> (120.0, 30.0), largest first."""
+    return tuple(sorted((float(v) for v in value.split(",") if v.strip()), reverse=True))
+
+
+class TimerWheel:
+    """Hashed timer wheel with `slots` buckets of `tick` seconds each.
+
+    A timer further away than one revolution sits in its bucket until the
+    wheel comes round to it on the right lap.
+    """
+
+    def __init__(self, tick=1.0, slots=512, now=None):
+        self.tick = tick
+        self.slots = [[] for _ in range(slots)]
+        self.position = self._index(time.time() if now is None else now)
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def _index(self, when):
+        return int(when // self.tick)
+
+    def schedule(self, when, value):
+        # Anything already overdue fires on the next advance()
+        index = max(self._index(when), self.position)
+        self.slots[index % len(self.slots)].append((index, value))
+        self.count += 1
+
+    def advance(self, now):
+        """Return the values of every timer due at or before `now`."""
+        target = self._index(now)
+        due = []
+        # After a long sleep, one pass over the wheel covers every bucket
+        for step in range(min(target - self.position + 1, len(self.slots))):
+            slot = self.slots[(self.position + step) % len(self.slots)]
+            if not slot:
+                continue
+            keep = [(index, value) for index, value in slot if index > target]
+            due.extend(value for index, value in slot if index <= target)
+            slot[:] = keep
+        self.position = max(self.position, target + 1)
+        self.count -= len(due)
+        return due
+
+    def next_due(self):
+        """Time the next occupied bucket comes due, or None if the wheel is empty."""
+        if not self.count:
+            return None
+        size = len(self.slots)
+        for step in range(size):
+            slot = self.slots[(self.position + step) % size]
+            if any(index < self.position + size for index, _ in slot):
+                return (self.position + step) * self.tick
+        return min(index for slot in self.slots for index, _ in slot) * self.tick
+
+
+class AuctionQueue:
+    """Candidate auctions ordered by end time, re-checked at each offset before they close.
+
+    `check(candidates, offset)` is called from the queue's thread with the
+    listings whose `offset`-seconds-before-end timer fired; it should return
+    updated Candidates (e.g. with the current price) or None.
+    """
+
+    def __init__(self, check, offsets=None, tick=None):
+        self.check = check
+        self.offsets = parse_offsets(config.ENDGAME_OFFSETS) if offsets is None else tuple(sorted(offsets, reverse=True))
+        self.wheel = TimerWheel(config.ENDGAME_TICK if tick is None else tick)
+        self._heap = []
+        self._entries = {}
+        self._dirty = set()
+        self._removed = set()
+        self._cond = threading.Condition()
+        self._thread = None
+        self._stopped = False
+        self.checks = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def push(self, candidate, now=None):
+        """Add a listing (or refresh the one already queued) and schedule its remaining re-checks."""
+        if candidate.end_time is None:
+            return
+        candidate = candidate._replace(end_time=utc(candidate.end_time))
+        end = candidate.end_time.timestamp()
+        now = time.time() if now is None else now
+        if end <= now:
+            return
+        with self._cond:
+            old = self._entries.get(candidate.item_id)
+            if candidate != old:
+                self._entries[candidate.item_id] = candidate
+                self._dirty.add(candidate.item_id)
+                self._removed.discard(candidate.item_id)
+            if old is None or old.end_time != candidate.end_time:
+                heapq.heappush(self._heap, (end, candidate.item_id))
+                for offset in self.offsets:
+                    if end - offset > now:
+                        self.wheel.schedule(end - offset, (candidate.item_id, end, offset))
+            self._cond.notify()
+
+    def load(self, candidates, now=None):
+        """Restore persisted listings; ones that ended in the meantime are queued for deletion."""
+        now = time.time() if now is None else now
+        for candidate in candidates:
+            if candidate.end_time is None or utc(candidate.end_time).timestamp() <= now:
+                with self._cond:
+                    self._removed.add(candidate.item_id)
+                continue
+            self.push(candidate, now)
+        with self._cond:
+            self._dirty.clear()
+
+    def expire(self, now=None):
+        """Drop auctions that have ended, earliest first off the heap."""
+        now = time.time() if now is None else now
+        with self._cond:
+            while self._heap and self._heap[0][0] <= now:
+                end, item_id = heapq.heappop(self._heap)
+                entry = self._entries.get(item_id)
+                # Stale heap entries (the end time changed) are skipped
+                if entry is not None and entry.end_time.timestamp() == end:
+                    del self._entries[item_id]
+                    self._dirty.discard(item_id)
+                    self._removed.add(item_id)
+
+    def due(self, now=None):
+        """Return {offset: [Candidate, ...]} for the re-checks due at `now`."""
+        now = time.time() if now is None else now
+        batches = {}
+        with self._cond:
+            for item_id, end, offset in self.wheel.advance(now):
+                entry = self._entries.get(item_id)
+                if entry is not None and entry.end_time.timestamp() == end and end > now:
+                    batches.setdefault(offset, []).append(entry)
+        return batches
+
+    def run_once(self, now=None):
+        """Fire due re-checks, fold their results back in and drop ended auctions."""
+        now = time.time() if now is None else now
+        for offset, candidates in self.due(now).items():
+            self.checks += len(candidates)
+            for candidate in self.check(candidates, offset) or []:
+                self.push(candidate, now)
+        self.expire(now)
+
+    def drain(self):
+        """Return (changed candidates, removed item ids) since the last drain, for persisting."""
+        with self._cond:
+            changed = [self._entries[item_id] for item_id in self._dirty]
+            removed = list(self._removed)
+            self._dirty.clear()
+            self._removed.clear()
+        return changed, removed
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if self._stopped:
+                    return
+                wake = self.wheel.next_due()
+                if wake is None and self._heap:
+                    wake = self._heap[0][0]
+                delay = None if wake is None else wake - time.time()
+                if delay is None or delay > 0:
+                    # push() notifies, so a newly scheduled earlier timer wakes us up
+                    self._cond.wait(delay)
+                    continue
+            try:
+                self.run_once()
+            except Exception:
+                # Keep the thread alive; the next timer gets another go
+                logging.exception("Endgame re-check error")
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="endgame", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+
@@ -0,0 +1,18 @@
+# env.py
+# .env loading for entry points.
+#
+# src.config reads the environment once, when it is first imported, and
+# values taken from it at import time (default arguments, profiling.settings)
+# keep whatever it saw. So entry points (src.wsgi, the worker, the modules'
+# __main__ blocks) call load_env() before importing anything that pulls in
+# src.config, and importing the rest of the package never touches .env.
+import logging
+import sys
+
+
+def load_env():
+    """Load .env into os.environ, without overriding variables that are already set."""
+    from dotenv import load_dotenv
+    if "src.config" in sys.modules:
+        logging.warning("load_env() called after src.config was imported; .env values will be ignored")
+    load_dotenv()
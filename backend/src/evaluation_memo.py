@@ -0,0 +1,88 @@
+# evaluation_memo.py
+# Per-listing memo of the last evaluation, so each poll only sends new
+# listings down the expensive comp path.
+#
+# An entry remembers the price a listing was scored at and the comp stats it
+# was scored against. While those comp stats are younger than COMP_STATS_TTL,
+# comps() hands them back and the listing is scored (a cheap comparison)
+# without going near the Finding API; a new or stale listing gets None and the
+# caller fetches comps and records them. Only entries whose price, comps or
+# verdict actually changed are written back, with updated_at bumped so
+# incremental exports pick up every change.
+#
+# Entries are dropped once the listing's end time has passed. The memo itself
+# is plain Python; app.py loads and saves it through the listing_evaluations
+# table so it survives restarts.
+from collections import namedtuple
+from datetime import datetime, timedelta, timezone
+
+from . import config
+
+MemoEntry = namedtuple("MemoEntry", [
+    "item_id", "price", "comp_avg", "comp_count", "undervalued", "end_time", "comps_checked_at", "updated_at",
+])
+
+
+def utc(value):
+    """Treat naive datetimes (as stored in the DB and parsed by ebaysdk) as UTC."""
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+class EvaluationMemo:
+    def __init__(self, comp_ttl=None):
+        self.comp_ttl = timedelta(seconds=config.COMP_STATS_TTL if comp_ttl is None else comp_ttl)
+        self._entries = {}
+        self._dirty = set()
+        self._expired = set()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def load(self, entries):
+        for entry in entries:
+            self._entries[entry.item_id] = entry._replace(
+                end_time=utc(entry.end_time), comps_checked_at=utc(entry.comps_checked_at),
+                updated_at=utc(entry.updated_at))
+
+    def comps(self, item_id, now=None):
+        """Return (comp_avg, comp_count) if the listing's comp stats are still fresh, else None."""
+        now = now or datetime.now(timezone.utc)
+        entry = self._entries.get(item_id)
+        if entry is None or now - entry.comps_checked_at > self.comp_ttl:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry.comp_avg, entry.comp_count
+
+    def record(self, item_id, price, comp_avg, comp_count, undervalued, end_time, refreshed=True, now=None):
+        """Remember an evaluation. Pass refreshed=False when the comps came from comps()."""
+        now = now or datetime.now(timezone.utc)
+        old = self._entries.get(item_id)
+        checked_at = now if refreshed or old is None else old.comps_checked_at
+        entry = MemoEntry(item_id, price, comp_avg, comp_count, undervalued, utc(end_time), checked_at,
+                          old.updated_at if old is not None else now)
+        if entry != old:
+            self._entries[item_id] = entry._replace(updated_at=now)
+            self._dirty.add(item_id)
+        self._expired.discard(item_id)
+
+    def expire(self, now=None):
+        """Forget listings that have already ended."""
+        now = now or datetime.now(timezone.utc)
+        for item_id, entry in list(self._entries.items()):
+            if entry.end_time is not None and entry.end_time <= now:
+                del self._entries[item_id]
+                self._dirty.discard(item_id)
+                self._expired.add(item_id)
+
+    def drain(self):
+        """Return (changed entries, expired item ids) since the last drain, for persisting."""
+        changed = [self._entries[item_id] for item_id in self._dirty]
+        expired = list(self._expired)
+        self._dirty.clear()
+        self._expired.clear()
+        return changed, expired
@@ -0,0 +1,162 @@
+# export.py
+# Streaming export of scanner tables for analytics.
+#
+# Rows are read through a server-side cursor in batches of EXPORT_BATCH_SIZE
+# and written out batch by batch as gzip'd CSV or Parquet (one row group per
+# batch), so an export never holds a whole table in memory. Each table has a
+# watermark column; passing `since` exports only rows changed after it, and
+# every export reports the watermark to use next time. Set
+# EXPORT_DATABASE_URI to point exports at a read replica instead of the
+# primary.
+#
+# From the command line, build the app without the scheduler so an export
+# never starts polling eBay:
+#   flask --app "src.app:create_app(run_scheduler=False)" export listing_evaluations --since 2026-10-01T00:00
+# (the flask command loads .env itself before importing the app).
+#
+# The scanner keeps alerts in memory only, so there is no alerts table to
+# export; listing_evaluations holds the latest price and comp stats observed
+# for each listing.
+import csv
+import io
+import zlib
+from datetime import datetime
+
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import create_engine, func, select
+
+from . import config
+from .models import db, TrackedItem, BuyItNowAverage, ListingEvaluation, WatchRule
+
+# table name -> (model, watermark column)
+EXPORTS = {
+    "tracked_items": (TrackedItem, TrackedItem.last_checked),
+    "buy_it_now_averages": (BuyItNowAverage, BuyItNowAverage.updated_at),
+    "listing_evaluations": (ListingEvaluation, ListingEvaluation.updated_at),
+    "watch_rules": (WatchRule, WatchRule.updated_at),
+}
+FORMATS = ("csv.gz", "parquet")
+
+# Column types as understood by pyarrow's schema parser, keyed by SQLAlchemy type name
+_ARROW_TYPES = {
+    "String": "string",
+    "Float": "double",
+    "Integer": "int64",
+    "Boolean": "bool",
+    "DateTime": "timestamp[us]",
+}
+
+_engine = None
+
+
+class ExportError(Exception):
+    pass
+
+
+def _get_engine():
+    global _engine
+    if not config.EXPORT_DATABASE_URI:
+        return db.engine
+    if _engine is None:
+        _engine = create_engine(config.EXPORT_DATABASE_URI)
+    return _engine
+
+
+def parse_watermark(value):
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise ExportError(f"Invalid watermark {value!r}, expected an ISO timestamp")
+
+
+class Export:
+    """One table export between `since` (exclusive) and the table's current max watermark."""
+
+    def __init__(self, table, since=None, batch_size=None):
+        if table not in EXPORTS:
+            raise ExportError(f"Unknown table {table!r}, expected one of {sorted(EXPORTS)}")
+        self.model, self.watermark_column = EXPORTS[table]
+        self.table = table
+        self.since = since
+        self.batch_size = batch_size or config.EXPORT_BATCH_SIZE
+        self.columns = [c.name for c in self.model.__table__.columns]
+        # Fix the upper bound up front so the export is a consistent slice and
+        # the next watermark is known before any rows are streamed
+        with _get_engine().connect() as conn:
+            self.watermark = conn.execute(select(func.max(self.watermark_column))).scalar() or since
+
+    def batches(self):
+        """Yield lists of row tuples, fetched through a server-side cursor."""
+        if self.watermark is None:
+            return
+        stmt = select(*self.model.__table__.columns).where(self.watermark_column <= self.watermark)
+        if self.since is not None:
+            stmt = stmt.where(self.watermark_column > self.since)
+        stmt = stmt.order_by(self.watermark_column)
+        with _get_engine().connect() as conn:
+            # yield_per turns on stream_results, i.e. a server-side cursor
+            result = conn.execution_options(yield_per=self.batch_size).execute(stmt)
+            for partition in result.partitions():
+                yield [tuple(row) for row in partition]
+
+    def iter_csv_gz(self):
+        """Yield gzip-compressed CSV chunks (header first)."""
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31 -> gzip container
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(self.columns)
+        for batch in self.batches():
+            writer.writerows(batch)
+            chunk = compressor.compress(buffer.getvalue().encode("utf-8"))
+            buffer.seek(0)
+            buffer.truncate()
+            if chunk:
+                yield chunk
+        yield compressor.compress(buffer.getvalue().encode("utf-8")) + compressor.flush()
+
+    def write_parquet(self, sink):
+        """Write the export as Parquet to a path or binary file object, one row group per batch."""
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ExportError("Parquet export needs pyarrow installed; use csv.gz instead")
+        schema = pa.schema([(c.name, pa.type_for_alias(_ARROW_TYPES.get(type(c.type).__name__, "string")))
+                            for c in self.model.__table__.columns])
+        with pq.ParquetWriter(sink, schema, compression="zstd") as writer:
+            for batch in self.batches():
+                writer.write_table(pa.Table.from_pylist([dict(zip(self.columns, row)) for row in batch], schema=schema))
+
+    def write(self, fmt, sink):
+        if fmt == "parquet":
+            self.write_parquet(sink)
+        elif fmt == "csv.gz":
+            for chunk in self.iter_csv_gz():
+                sink.write(chunk)
+        else:
+            raise ExportError(f"Unknown format {fmt!r}, expected one of {FORMATS}")
+
+
+@click.command("export")
+@click.argument("table", type=click.Choice(sorted(EXPORTS)))
+@click.option("--format", "fmt", type=click.Choice(FORMATS), default="csv.gz")
+@click.option("--since", default=None, help="Only export rows changed after this ISO timestamp.")
+@click.option("--output", "-o", default=None, help="Output file (default: <table>-<watermark>.<format>).")
+@with_appcontext
+def export_command(table, fmt, since, output):
+    """Stream a table to gzip'd CSV or Parquet."""
+    try:
+        export = Export(table, parse_watermark(since))
+        if export.watermark is None:
+            click.echo(f"{table} is empty, nothing to export")
+            return
+        output = output or f"{table}-{export.watermark:%Y%m%dT%H%M%S}.{fmt}"
+        with open(output, "wb") as f:
+            export.write(fmt, f)
+    except ExportError as e:
+        raise click.ClickException(str(e))
+    click.echo(f"Exported {table} to {output}")
+    click.echo(f"Next watermark: {export.watermark.isoformat()}")
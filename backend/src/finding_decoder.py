@@ -0,0 +1,267 @@
+# finding_decoder.py
+# Lightweight decoder for Finding API responses.
+#
+# ebaysdk turns every response into a full ResponseDataObject tree before we
+# look at it, even though the scanner only reads a handful of fields per item.
+# This module talks to the Finding service directly and pulls just those
+# fields out, either from the JSON response format or by walking the XML
+# response incrementally one <item> at a time.
+import io
+import json
+import xml.etree.ElementTree as ET
+from collections import namedtuple
+from datetime import datetime
+
+import requests
+
+from . import config
+from . import replay
+from . import resilience
+from .profiling import span
+
+FINDING_PATH = "/services/search/FindingService/v1"
+SERVICE_VERSION = "1.13.0"
+
+# The only per-item fields the scanner cares about
+Listing = namedtuple("Listing", [
+    "item_id", "title", "price", "currency", "url",
+    "end_time", "category_id", "product_id", "condition",
+])
+
+# Shared session so consecutive pages reuse the same keep-alive connection
+_session = None
+
+
+class FindingError(Exception):
+    """Raised when the Finding API answers with ack=Failure."""
+
+
+def _get_session():
+    global _session
+    if _session is None:
+        _session = requests.Session()
+    return _session
+
+
+def _parse_time(value):
+    if not value:
+        return None
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def _float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def build_params(call, payload, response_format="JSON"):
+    """Flatten an ebaysdk-style payload into Finding name-value URL params.
+
+    {"paginationInput": {"entriesPerPage": 100},
+     "itemFilter": [{"name": "EndTimeTo", "value": "..."}]}
+    becomes paginationInput.entriesPerPage=100, itemFilter(0).name=EndTimeTo, ...
+    """
+    params = {
+        "OPERATION-NAME": call,
+        "SERVICE-VERSION": SERVICE_VERSION,
+        "SECURITY-APPNAME": config.APP_ID,
+        "GLOBAL-ID": "EBAY-US",
+        "RESPONSE-DATA-FORMAT": response_format,
+    }
+
+    def flatten(prefix, value):
+        if isinstance(value, dict):
+            for key, sub in value.items():
+                flatten(f"{prefix}.{key}" if prefix else key, sub)
+        elif isinstance(value, (list, tuple)):
+            for index, sub in enumerate(value):
+                flatten(f"{prefix}({index})", sub)
+        else:
+            params[prefix] = value
+
+    flatten("", payload)
+    return params
+
+
+RETRYABLE = (requests.ConnectionError, requests.Timeout, resilience.ServerError)
+
+
+def _fetch_once(call, payload, response_format, domain, timeout):
+    url = f"https://{domain or config.FINDING_DOMAIN}{FINDING_PATH}"
+    with span("ebay"):
+        resp = _get_session().get(url, params=build_params(call, payload, response_format), timeout=timeout)
+        if resp.status_code >= 500:
+            raise resilience.ServerError(f"Finding API returned HTTP {resp.status_code}")
+        resp.raise_for_status()
+        return resp.content
+
+
+def _fetch_live(call, payload, response_format, domain, timeout, hedge):
+    def request(deadline=None):
+        return resilience.call(
+            lambda remaining: _fetch_once(call, payload, response_format, domain, remaining),
+            retry_on=RETRYABLE, breaker=resilience.get_breaker("finding"), timeout=timeout, deadline=deadline)
+    return resilience.hedged(request, timeout=timeout) if hedge else request()
+
+
+def fetch(call, payload, response_format="JSON", domain=None, timeout=None, hedge=False):
+    """Execute a Finding call and return the raw response body.
+
+    The call runs under resilience.call() (deadline, retries, circuit breaker)
+    and, with hedge=True, may race a duplicate request. When a fixture mode is
+    configured the body comes from (or is recorded to) the replay store instead
+    of going straight to eBay.
+    """
+    store = replay.get_store()
+    if store is None:
+        return _fetch_live(call, payload, response_format, domain, timeout, hedge)
+    return store.fetch(call, payload, response_format,
+                       lambda: _fetch_live(call, payload, response_format, domain, timeout, hedge))
+
+
+# --- JSON ------------------------------------------------------------------
+# The Finding JSON format wraps every value in a single-element list and puts
+# attribute-carrying text under "__value__".
+
+def _first(node, key):
+    value = node.get(key)
+    if isinstance(value, list):
+        return value[0] if value else None
+    return value
+
+
+def _text(node, *path):
+    for key in path:
+        if not isinstance(node, dict):
+            return None
+        node = _first(node, key)
+    if isinstance(node, dict):
+        return node.get("__value__")
+    return node
+
+
+def _json_listing(item):
+    price = _first(_first(item, "sellingStatus") or {}, "currentPrice") or {}
+    return Listing(
+        item_id=_text(item, "itemId"),
+        title=_text(item, "title"),
+        price=_float(price.get("__value__")),
+        currency=price.get("@currencyId"),
+        url=_text(item, "viewItemURL"),
+        end_time=_parse_time(_text(item, "listingInfo", "endTime")),
+        category_id=_text(item, "primaryCategory", "categoryId"),
+        product_id=_text(item, "productId"),
+        condition=_text(item, "condition", "conditionDisplayName"),
+    )
+
+
+def parse_json(body, call):
+    """Decode a JSON Finding response into (listings, total_pages)."""
+    data = json.loads(body)
+    response = _first(data, f"{call}Response") or {}
+    if _text(response, "ack") == "Failure":
+        raise FindingError(_text(response, "errorMessage", "error", "message") or "Finding API failure")
+    result = _first(response, "searchResult") or {}
+    listings = [_json_listing(item) for item in result.get("item", [])]
+    total_pages = _text(response, "paginationOutput", "totalPages")
+    return listings, int(total_pages or 1)
+
+
+# --- XML -------------------------------------------------------------------
+
+def _local(tag):
+    return tag.rsplit("}", 1)[-1]
+
+
+def _xml_listing(elem, ns):
+    def text(path):
+        return elem.findtext("/".join(ns + part for part in path.split("/")))
+
+    price_elem = elem.find(f"{ns}sellingStatus/{ns}currentPrice")
+    return Listing(
+        item_id=text("itemId"),
+        title=text("title"),
+        price=_float(price_elem.text) if price_elem is not None else None,
+        currency=price_elem.get("currencyId") if price_elem is not None else None,
+        url=text("viewItemURL"),
+        end_time=_parse_time(text("listingInfo/endTime")),
+        category_id=text("primaryCategory/categoryId"),
+        product_id=text("productId"),
+        condition=text("condition/conditionDisplayName"),
+    )
+
+
+class XmlResponse:
+    """Incrementally decoded XML Finding response.
+
+    Iterating yields Listing tuples as each <item> closes and discards the
+    element straight away, so at most one item subtree is held in memory.
+    total_pages is filled in once iteration has finished.
+    """
+
+    def __init__(self, source):
+        if isinstance(source, (bytes, bytearray)):
+            source = io.BytesIO(source)
+        self.source = source
+        self.total_pages = None
+
+    def __iter__(self):
+        ns = ""
+        ack = None
+        error = None
+        total_pages = 1
+        for event, elem in ET.iterparse(self.source, events=("start", "end")):
+            if event == "start":
+                if not ns and elem.tag.startswith("{"):
+                    ns = elem.tag[:elem.tag.index("}") + 1]
+                continue
+            name = _local(elem.tag)
+            if name == "item":
+                yield _xml_listing(elem, ns)
+                elem.clear()
+            elif name == "ack":
+                ack = elem.text
+            elif name == "message" and error is None:
+                error = elem.text
+            elif name == "totalPages":
+                total_pages = int(elem.text or 1)
+        if ack == "Failure":
+            raise FindingError(error or "Finding API failure")
+        self.total_pages = total_pages
+
+
+def iter_xml(source):
+    """Return an XmlResponse over `source` (bytes or a binary file object)."""
+    return XmlResponse(source)
+
+
+def parse_xml(body):
+    """Decode an XML Finding response into (listings, total_pages)."""
+    response = iter_xml(body)
+    listings = list(response)
+    return listings, response.total_pages
+
+
+def parse(body, call, response_format="JSON"):
+    with span("parse"):
+        if response_format == "XML":
+            return parse_xml(body)
+        return parse_json(body, call)
+
+
+def find_items(call, payload, pages=1, response_format=None, domain=None, timeout=None, hedge=False):
+    """Run a Finding search and return Listing tuples, following up to `pages` pages."""
+    response_format = response_format or config.RESPONSE_FORMAT
+    listings = []
+    page = 1
+    while True:
+        page_payload = dict(payload)
+        page_payload["paginationInput"] = dict(payload.get("paginationInput", {}), pageNumber=page)
+        body = fetch(call, page_payload, response_format, domain=domain, timeout=timeout, hedge=hedge)
+        items, total_pages = parse(body, call, response_format)
+        listings.extend(items)
+        if page >= min(pages, total_pages):
+            return listings
+        page += 1
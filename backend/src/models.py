@@ -0,0 +1,84 @@
+# models.py
+# SQLAlchemy models. The db object is bound to an app in app.create_app(), so
+# importing this module (e.g. from Alembic) doesn't touch the database.
+from flask_sqlalchemy import SQLAlchemy
+
+db = SQLAlchemy()
+
+class TrackedItem(db.Model):
+    __tablename__ = 'tracked_items'
+    # Mirrors migration c2e7f05a8d61 so autogenerate doesn't try to drop them
+    __table_args__ = (
+        db.Index('ix_tracked_items_end_time', 'end_time'),
+        db.Index('ix_tracked_items_category_id_end_time', 'category_id', 'end_time'),
+        db.Index('ix_tracked_items_last_checked', 'last_checked'),
+        db.Index('ix_tracked_items_upc', 'upc', postgresql_where=db.text('upc IS NOT NULL')),
+        db.Index('ix_tracked_items_ean', 'ean', postgresql_where=db.text('ean IS NOT NULL')),
+        db.Index('ix_tracked_items_gtin', 'gtin', postgresql_where=db.text('gtin IS NOT NULL')),
+    )
+    id = db.Column(db.String, primary_key=True)
+    title = db.Column(db.String, nullable=False)
+    current_price = db.Column(db.Float, nullable=False)
+    end_time = db.Column(db.DateTime, nullable=False)
+    upc = db.Column(db.String, nullable=True)
+    ean = db.Column(db.String, nullable=True)
+    gtin = db.Column(db.String, nullable=True)
+    category_id = db.Column(db.String, nullable=True)
+    last_checked = db.Column(db.DateTime, nullable=False)
+
+class BuyItNowAverage(db.Model):
+    __tablename__ = 'buy_it_now_averages'
+    item_type = db.Column(db.String, primary_key=True)
+    average_price = db.Column(db.Float, nullable=False)
+    updated_at = db.Column(db.DateTime, nullable=False)
+
+class ListingEvaluation(db.Model):
+    __tablename__ = 'listing_evaluations'
+    __table_args__ = (
+        db.Index('ix_listing_evaluations_end_time', 'end_time'),
+        db.Index('ix_listing_evaluations_comps_checked_at', 'comps_checked_at'),
+        db.Index('ix_listing_evaluations_updated_at', 'updated_at'),
+    )
+    item_id = db.Column(db.String, primary_key=True)
+    price = db.Column(db.Float, nullable=False)
+    comp_avg = db.Column(db.Float, nullable=False)
+    comp_count = db.Column(db.Integer, nullable=False)
+    undervalued = db.Column(db.Boolean, nullable=False)
+    end_time = db.Column(db.DateTime, nullable=True)
+    comps_checked_at = db.Column(db.DateTime, nullable=False)
+    updated_at = db.Column(db.DateTime, nullable=False)
+
+class WatchRule(db.Model):
+    __tablename__ = 'watch_rules'
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String, nullable=False)
+    keywords = db.Column(db.String, nullable=True)
+    category_id = db.Column(db.String, nullable=True)
+    max_price = db.Column(db.Float, nullable=True)
+    ratio = db.Column(db.Float, nullable=True)
+    condition = db.Column(db.String, nullable=True)
+    enabled = db.Column(db.Boolean, nullable=False, default=True)
+    updated_at = db.Column(db.DateTime, nullable=False)
+
+class AuctionWatch(db.Model):
+    __tablename__ = 'auction_watches'
+    __table_args__ = (
+        db.Index('ix_auction_watches_end_time', 'end_time'),
+    )
+    item_id = db.Column(db.String, primary_key=True)
+    title = db.Column(db.String, nullable=False)
+    url = db.Column(db.String, nullable=True)
+    category_id = db.Column(db.String, nullable=True)
+    condition = db.Column(db.String, nullable=True)
+    price = db.Column(db.Float, nullable=False)
+    comp_avg = db.Column(db.Float, nullable=False)
+    comp_count = db.Column(db.Integer, nullable=False)
+    end_time = db.Column(db.DateTime, nullable=False)
+
+class ProfilingSettings(db.Model):
+    # A single row (id=1) written by /admin/profiling and read by every process
+    __tablename__ = 'profiling_settings'
+    id = db.Column(db.Integer, primary_key=True)
+    mode = db.Column(db.String, nullable=False)
+    rate = db.Column(db.Float, nullable=False)
+    updated_at = db.Column(db.DateTime, nullable=False)
@@ -0,0 +1,193 @@
+# profiling.py
+# Opt-in profiling for scan cycles and Flask requests.
+#
+# Every profiled unit of work (a scan cycle, a request) gets a Trace that
+# collects span timings such as "ebay", "parse" and "db"; these are cheap and
+# recorded on every cycle. On top of that, a fraction of units (PROFILE_RATE)
+# also run under a profiler:
+#   sample   - a background thread samples the worker thread's stack every
+#              PROFILE_INTERVAL_MS and writes collapsed stacks (one
+#              "frame;frame;frame count" line per stack), ready for
+#              flamegraph.pl or speedscope
+#   cprofile - runs cProfile and writes a .prof file for pstats/snakeviz
+# Each profiled unit writes <name>-<timestamp>.json with its spans next to the
+# profile output in PROFILE_DIR.
+import contextvars
+import cProfile
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+
+from . import config
+
+MODES = ("sample", "cprofile")
+
+# Runtime settings; the admin endpoint can change these without a restart
+settings = {
+    "mode": config.PROFILE_MODE,
+    "rate": config.PROFILE_RATE,
+}
+
+_current_trace = contextvars.ContextVar("current_trace", default=None)
+_cprofile_lock = threading.Lock()
+
+
+class Trace:
+    def __init__(self, name):
+        self.name = name
+        self.started = time.perf_counter()
+        self.elapsed = None
+        self.spans = defaultdict(float)
+        self.counts = Counter()
+
+    def add(self, span_name, seconds):
+        self.spans[span_name] += seconds
+        self.counts[span_name] += 1
+
+    def summary(self):
+        # Spans from concurrent async requests overlap, so their sum can exceed the total
+        return {
+            "name": self.name,
+            "total_ms": round((self.elapsed or 0) * 1000, 3),
+            "spans": {key: {"ms": round(value * 1000, 3), "count": self.counts[key]}
+                      for key, value in sorted(self.spans.items())},
+        }
+
+
+@contextmanager
+def span(name):
+    """Time a block and add it to the current trace, if there is one."""
+    trace = _current_trace.get()
+    if trace is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.add(name, time.perf_counter() - start)
+
+
+def record(name, seconds):
+    """Add a duration measured elsewhere (e.g. a response's elapsed time) to the current trace."""
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.add(name, seconds)
+
+
+def current_trace():
+    return _current_trace.get()
+
+
+class StackSampler:
+    """Samples one thread's Python stack on a timer and counts collapsed stacks."""
+
+    def __init__(self, thread_id, interval):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def write_collapsed(self, path):
+        with open(path, "w") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+def should_profile():
+    return settings["mode"] in MODES and random.random() < settings["rate"]
+
+
+def _output_path(name, suffix):
+    os.makedirs(config.PROFILE_DIR, exist_ok=True)
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+    return os.path.join(config.PROFILE_DIR, f"{name}-{stamp}{suffix}")
+
+
+def _start_cprofile(name):
+    """Return an enabled cProfile.Profile, or None if another unit is already being profiled.
+
+    Only one profiler can be active per process (Python 3.12+ raises
+    ValueError for a second one), and scans, endgame re-checks and requests
+    run on different threads, so an overlapping unit falls back to spans only.
+    """
+    if not _cprofile_lock.acquire(blocking=False):
+        logging.debug(f"Profiler busy, tracing {name} with spans only")
+        return None
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError as e:
+        # Some other tool (a debugger, coverage) holds the profiling hook
+        _cprofile_lock.release()
+        logging.debug(f"Could not profile {name}: {e}")
+        return None
+    return profiler
+
+
+@contextmanager
+def profile(name, sampled=None):
+    """Trace a unit of work and, if it is sampled, profile it too.
+
+    Yields the Trace so callers can add their own spans.
+    """
+    trace = Trace(name)
+    mode = settings["mode"] if (should_profile() if sampled is None else sampled) else None
+    profiler = sampler = None
+    token = _current_trace.set(trace)
+    try:
+        if mode == "cprofile":
+            profiler = _start_cprofile(name)
+            if profiler is None:
+                mode = None
+        elif mode == "sample":
+            sampler = StackSampler(threading.get_ident(), config.PROFILE_INTERVAL_MS / 1000)
+            sampler.start()
+        yield trace
+    finally:
+        trace.elapsed = time.perf_counter() - trace.started
+        _current_trace.reset(token)
+        if profiler is not None:
+            profiler.disable()
+            _cprofile_lock.release()
+        if sampler is not None:
+            sampler.stop()
+        summary = trace.summary()
+        logging.info(f"Trace {json.dumps(summary)}")
+        if mode:
+            try:
+                base = _output_path(name, "")
+                if profiler is not None:
+                    profiler.dump_stats(base + ".prof")
+                if sampler is not None:
+                    sampler.write_collapsed(base + ".collapsed")
+                with open(base + ".json", "w") as f:
+                    json.dump(summary, f, indent=2)
+            except OSError as e:
+                logging.error(f"Could not write profile for {name}: {e}")
@@ -0,0 +1,141 @@
+# replay.py
+# Record/replay fixture store for Finding API traffic.
+#
+# Modes (EBAY_FIXTURE_MODE):
+#   record  - call eBay as usual and save every response body
+#   replay  - serve saved responses, fall back to eBay (and record) on a miss
+#   offline - serve saved responses only; a miss raises FixtureMissing
+#
+# Only Finding traffic goes through the store. Endgame re-checks (Shopping API
+# and its OAuth token) always go to eBay, so they're switched off offline.
+#
+# Responses are stored zlib-compressed in a single SQLite file keyed by a hash
+# of the call name, response format and payload. Time-window filters such as
+# EndTimeFrom/EndTimeTo change on every run, so their values are left out of
+# the key to keep replays deterministic.
+if __name__ == "__main__":
+    # Run as a script: load .env before src.config is imported below
+    from .env import load_env
+    load_env()
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import zlib
+
+from . import config
+
+MODES = ("record", "replay", "offline")
+VOLATILE_FILTERS = {"EndTimeFrom", "EndTimeTo", "StartTimeFrom", "StartTimeTo", "ModTimeFrom"}
+
+_store = None
+_store_lock = threading.Lock()
+
+
+class FixtureMissing(LookupError):
+    """Raised in offline mode when no recorded response matches a request."""
+
+
+def _normalize(payload):
+    if isinstance(payload, dict):
+        if payload.get("name") in VOLATILE_FILTERS and "value" in payload:
+            return {"name": payload["name"], "value": "*"}
+        return {key: _normalize(value) for key, value in payload.items()}
+    if isinstance(payload, (list, tuple)):
+        return [_normalize(value) for value in payload]
+    return str(payload)
+
+
+def fixture_key(call, payload, response_format):
+    canonical = json.dumps([call, response_format, _normalize(payload)], sort_keys=True, separators=(",", ":"))
+    return hashlib.sha1(canonical.encode("utf-8")).hexdigest()
+
+
+class FixtureStore:
+    def __init__(self, path, mode="replay"):
+        if mode not in MODES:
+            raise ValueError(f"Unknown fixture mode {mode!r}, expected one of {MODES}")
+        self.path = path
+        self.mode = mode
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY,"
+            " call TEXT NOT NULL,"
+            " response_format TEXT NOT NULL,"
+            " request TEXT NOT NULL,"
+            " body BLOB NOT NULL,"
+            " recorded_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get(self, key):
+        with self._lock:
+            row = self._conn.execute("SELECT body FROM responses WHERE key = ?", (key,)).fetchone()
+        return zlib.decompress(row[0]) if row else None
+
+    def put(self, key, call, payload, response_format, body):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                (key, call, response_format, json.dumps(_normalize(payload), sort_keys=True),
+                 zlib.compress(body, 9), time.time()),
+            )
+            self._conn.commit()
+
+    def lookup(self, call, payload, response_format):
+        """Return the recorded body for a request, or None when the caller should go to eBay.
+
+        Raises FixtureMissing in offline mode instead of returning None.
+        """
+        if self.mode == "record":
+            return None
+        body = self.get(fixture_key(call, payload, response_format))
+        if body is None and self.mode == "offline":
+            raise FixtureMissing(f"No recorded response for {call} {json.dumps(_normalize(payload), sort_keys=True)}")
+        return body
+
+    def record(self, call, payload, response_format, body):
+        self.put(fixture_key(call, payload, response_format), call, payload, response_format, body)
+
+    def fetch(self, call, payload, response_format, live):
+        """Return the response body for a request, calling `live()` when the mode allows it."""
+        body = self.lookup(call, payload, response_format)
+        if body is None:
+            body = live()
+            self.record(call, payload, response_format, body)
+        return body
+
+    def entries(self):
+        with self._lock:
+            return self._conn.execute(
+                "SELECT call, response_format, request, length(body), recorded_at FROM responses ORDER BY recorded_at"
+            ).fetchall()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def get_store():
+    """Return the process-wide store for EBAY_FIXTURE_MODE, or None when fixtures are off."""
+    global _store
+    if not config.FIXTURE_MODE:
+        return None
+    with _store_lock:
+        if _store is None:
+            _store = FixtureStore(config.FIXTURE_PATH, config.FIXTURE_MODE)
+        return _store
+
+
+if __name__ == "__main__":
+    import sys
+
+    store = FixtureStore(sys.argv[1] if len(sys.argv) > 1 else config.FIXTURE_PATH)
+    rows = store.entries()
+    for call, response_format, request, size, recorded_at in rows:
+        stamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(recorded_at))
+        print(f"{stamp}  {call:<22} {response_format:<4} {size:>7}B  {request}")
+    print(f"{len(rows)} recorded responses in {store.path}")
@@ -0,0 +1,245 @@
+# resilience.py
+# Deadlines, retries, circuit breaking and request hedging for Finding calls.
+#
+# Every call gets a deadline (EBAY_CALL_TIMEOUT) that covers all of its
+# attempts; each attempt is given whatever time is left as its timeout.
+# Failed attempts are retried with full-jitter exponential backoff while the
+# deadline allows. A circuit breaker counts consecutive failures and, once
+# open, fails calls immediately until BREAKER_RESET_SECONDS have passed, when
+# a single trial call is let through. Hedging (HEDGE_AFTER_SECONDS > 0) sends
+# a duplicate of a slow request and takes whichever answer arrives first; it's
+# meant for idempotent reads like comp lookups.
+#
+# call() and hedged() are for the threaded code paths, async_call() and
+# async_hedged() for async_scout.
+import asyncio
+import contextvars
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from . import config
+
+
+class ResilienceError(Exception):
+    pass
+
+
+class CircuitOpenError(ResilienceError):
+    """Raised instead of calling eBay while the breaker is open."""
+
+
+class DeadlineExceeded(ResilienceError):
+    pass
+
+
+class ServerError(ResilienceError):
+    """eBay answered with a 5xx; worth retrying, unlike a 4xx."""
+
+
+class Deadline:
+    def __init__(self, seconds):
+        self.expires = time.monotonic() + seconds
+
+    def remaining(self):
+        return max(0.0, self.expires - time.monotonic())
+
+    def expired(self):
+        return self.remaining() <= 0
+
+
+class CircuitBreaker:
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half-open"
+
+    def __init__(self, name, failure_threshold=None, reset_seconds=None):
+        self.name = name
+        self.failure_threshold = failure_threshold or config.BREAKER_FAILURES
+        self.reset_seconds = config.BREAKER_RESET_SECONDS if reset_seconds is None else reset_seconds
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == self.CLOSED:
+                return
+            now = time.monotonic()
+            if now - self.opened_at < self.reset_seconds:
+                raise CircuitOpenError(f"{self.name} circuit {self.state} after {self.failures} failures")
+            # Let one trial call through; others keep failing fast until it reports
+            # back (or until another reset period passes, if it never does)
+            self.state = self.HALF_OPEN
+            self.opened_at = now
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    print(f"Circuit {self.name} opened after {self.failures} failures")
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(name):
+    with _breakers_lock:
+        if name not in _breakers:
+            _breakers[name] = CircuitBreaker(name)
+        return _breakers[name]
+
+
+def backoff_delay(attempt):
+    # Full jitter: uniform in [0, base * 2^attempt]
+    return random.uniform(0, config.EBAY_BACKOFF_BASE * (2 ** attempt))
+
+
+def call(fn, retry_on, breaker=None, timeout=None, retries=None, deadline=None):
+    """Call fn(timeout) with a deadline, jittered retries and an optional circuit breaker.
+
+    Pass `deadline` to share one Deadline between calls, e.g. hedged attempts.
+    """
+    deadline = deadline or Deadline(config.EBAY_CALL_TIMEOUT if timeout is None else timeout)
+    retries = config.EBAY_RETRIES if retries is None else retries
+    attempt = 0
+    while True:
+        # Time spent waiting for a worker isn't eBay's fault, so it isn't a breaker failure
+        if deadline.expired():
+            raise DeadlineExceeded(f"deadline passed before attempt {attempt + 1}")
+        if breaker is not None:
+            breaker.allow()
+        try:
+            result = fn(deadline.remaining())
+        except retry_on as e:
+            if breaker is not None:
+                breaker.record_failure()
+            delay = backoff_delay(attempt)
+            attempt += 1
+            if attempt > retries or deadline.remaining() <= delay:
+                if deadline.remaining() <= delay:
+                    raise DeadlineExceeded(f"gave up after {attempt} attempt(s): {e}") from e
+                raise
+            time.sleep(delay)
+            continue
+        except Exception:
+            # eBay answered (e.g. with an API error), so the service itself is up
+            if breaker is not None:
+                breaker.record_success()
+            raise
+        if breaker is not None:
+            breaker.record_success()
+        return result
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=config.HEDGE_MAX_WORKERS, thread_name_prefix="hedge")
+        return _executor
+
+
+def hedged(fn, hedge_after=None, timeout=None):
+    """Run fn(deadline); if it hasn't finished after hedge_after seconds, race a duplicate.
+
+    Both attempts share one Deadline, created before anything is submitted, and
+    the wait for them is bounded by it. The losing request isn't cancelled
+    (requests can't be interrupted), but it gives up when the deadline passes
+    and its result is dropped. Attempts run in a copy of the caller's context
+    so their spans land in the caller's trace.
+    """
+    hedge_after = config.HEDGE_AFTER_SECONDS if hedge_after is None else hedge_after
+    deadline = Deadline(config.EBAY_CALL_TIMEOUT if timeout is None else timeout)
+    if hedge_after <= 0:
+        return fn(deadline)
+    executor = _get_executor()
+
+    def submit():
+        return executor.submit(contextvars.copy_context().run, fn, deadline)
+
+    pending = {submit()}
+    done, pending = wait(pending, timeout=min(hedge_after, deadline.remaining()))
+    if not done and not deadline.expired():
+        pending.add(submit())
+    error = None
+    while True:
+        for future in done:
+            if future.exception() is None:
+                return future.result()
+            error = future.exception()
+        if not pending:
+            raise error
+        if deadline.expired():
+            raise DeadlineExceeded("hedged call timed out") from error
+        done, pending = wait(pending, timeout=deadline.remaining(), return_when=FIRST_COMPLETED)
+
+
+async def async_call(fn, retry_on, breaker=None, timeout=None, retries=None):
+    """Async version of call(): awaits fn(timeout) and sleeps without blocking the loop."""
+    deadline = Deadline(config.EBAY_CALL_TIMEOUT if timeout is None else timeout)
+    retries = config.EBAY_RETRIES if retries is None else retries
+    attempt = 0
+    while True:
+        if deadline.expired():
+            raise DeadlineExceeded(f"deadline passed before attempt {attempt + 1}")
+        if breaker is not None:
+            breaker.allow()
+        try:
+            result = await asyncio.wait_for(fn(deadline.remaining()), deadline.remaining())
+        except retry_on as e:
+            if breaker is not None:
+                breaker.record_failure()
+            delay = backoff_delay(attempt)
+            attempt += 1
+            if attempt > retries or deadline.remaining() <= delay:
+                if deadline.remaining() <= delay:
+                    raise DeadlineExceeded(f"gave up after {attempt} attempt(s): {e}") from e
+                raise
+            await asyncio.sleep(delay)
+            continue
+        except Exception:
+            # eBay answered (e.g. with an API error), so the service itself is up
+            if breaker is not None:
+                breaker.record_success()
+            raise
+        if breaker is not None:
+            breaker.record_success()
+        return result
+
+
+async def async_hedged(fn, hedge_after=None):
+    """Async version of hedged(); the losing request is cancelled."""
+    hedge_after = config.HEDGE_AFTER_SECONDS if hedge_after is None else hedge_after
+    if hedge_after <= 0:
+        return await fn()
+    tasks = {asyncio.ensure_future(fn())}
+    done, pending = await asyncio.wait(tasks, timeout=hedge_after)
+    if not done:
+        pending.add(asyncio.ensure_future(fn()))
+    error = None
+    try:
+        while True:
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+                error = task.exception()
+            if not pending:
+                raise error
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for task in pending:
+            task.cancel()
@@ -1,24 +1,128 @@
 # scout.py
+if __name__ == "__main__":
+    # Run as a script: load .env before src.config is imported below
+    from .env import load_env
+    load_env()
+from collections import namedtuple
 from datetime import datetime, timedelta, timezone
 from ebaysdk.finding import Connection as Finding
 from ebaysdk.exception import ConnectionError
+import requests
+import threading
+import time
 from . import config
+from . import finding_decoder
+from . import resilience
+from .endgame import Candidate
+from .finding_decoder import Listing, FindingError
+from .replay import FixtureMissing
+from .profiling import record
+from .resilience import ResilienceError
+
+# An item worth alerting on: undervalued by the global ratio and/or matching watch rules
+Evaluation = namedtuple("Evaluation", ["item", "comp_avg", "undervalued", "rules"])
+
+def _use_fast_decoder():
+    # Fixture record/replay works on raw response bodies, so it always goes through finding_decoder
+    return config.RESPONSE_DECODER == "fast" or bool(config.FIXTURE_MODE)
+
+def item_price(item):
+    # Listing tuples carry a float already; ebaysdk objects nest it under sellingStatus
+    if isinstance(item, Listing):
+        return item.price
+    return float(item.sellingStatus.currentPrice.value)
+
+def item_id(item):
+    if isinstance(item, Listing):
+        return item.item_id
+    return item.itemId
+
+def item_end_time(item):
+    if isinstance(item, Listing):
+        return item.end_time
+    return item.listingInfo.endTime
+
+def item_category(item):
+    if isinstance(item, Listing):
+        return item.category_id
+    return getattr(getattr(item, 'primaryCategory', None), 'categoryId', None)
+
+def item_condition(item):
+    if isinstance(item, Listing):
+        return item.condition
+    return getattr(getattr(item, 'condition', None), 'conditionDisplayName', None)
+
+def item_url(item):
+    if isinstance(item, Listing):
+        return item.url
+    return item.viewItemURL
+
+def ending_soon_payload(limit=25):
+    now = datetime.now(timezone.utc).isoformat().replace('+00:00', 'Z')
+    soon = (datetime.now(timezone.utc) + timedelta(minutes=10)).isoformat().replace('+00:00', 'Z')
+    return {
+        "keywords": "",
+        "paginationInput": {"entriesPerPage": limit},
+        "itemFilter": [
+            {"name": "EndTimeTo", "value": soon},
+            {"name": "EndTimeFrom", "value": now}
+        ]
+    }
+
+def completed_payload(title, limit=25):
+    return {
+        "keywords": title,
+        "paginationInput": {"entriesPerPage": limit}
+    }
+
+# Transport failures surface as requests exceptions and 5xx answers as ServerError;
+# anything else ebaysdk raises (e.g. ack=Failure) is a real answer and isn't retried
+RETRYABLE = (requests.ConnectionError, requests.Timeout, resilience.ServerError)
+
+def sdk_execute(api, call, payload):
+    start = time.perf_counter()
+    try:
+        return api.execute(call, payload)
+    except ConnectionError as e:
+        # ebaysdk raises ConnectionError for HTTP and API errors alike
+        if getattr(getattr(e, 'response', None), 'status_code', 0) >= 500:
+            raise resilience.ServerError(str(e)) from e
+        raise
+    finally:
+        _record_sdk_spans(api, time.perf_counter() - start)
+
+def _record_sdk_spans(api, total):
+    # execute() both makes the HTTP call and builds the response object tree;
+    # requests' elapsed (send until headers) is the eBay part, the rest is parsing
+    try:
+        elapsed = api.response.elapsed.total_seconds()
+    except AttributeError:
+        # No response at all (timeout, connection refused): it was all transport
+        record("ebay", total)
+        return
+    record("ebay", elapsed)
+    record("parse", max(total - elapsed, 0.0))
+
+def _execute(call, payload, hedge=False):
+    def attempt(remaining):
+        api = Finding(appid=config.APP_ID, siteid="EBAY-US", api_version="1.13.0", config_file=None,
+                      domain=config.FINDING_DOMAIN, timeout=remaining)
+        return sdk_execute(api, call, payload)
+
+    def request(deadline=None):
+        return resilience.call(attempt, retry_on=RETRYABLE, breaker=resilience.get_breaker("finding"), deadline=deadline)
+
+    return resilience.hedged(request) if hedge else request()
 
 def search_ending_soon(limit=25):
     # Adjusted to use the Finding API instead of Browse API
     try:
-        api = Finding(appid=config.APP_ID, siteid="EBAY-US", api_version="1.13.0", config_file=None, domain="svcs.sandbox.ebay.com")
-        now = datetime.now(timezone.utc).isoformat().replace('+00:00', 'Z')
-        soon = (datetime.now(timezone.utc) + timedelta(minutes=10)).isoformat().replace('+00:00', 'Z')
-        resp = api.execute("findItemsAdvanced", {
-            "keywords": "",
-            "paginationInput": {"entriesPerPage": limit},
-            "itemFilter": [
-                {"name": "EndTimeTo", "value": soon},
-                {"name": "EndTimeFrom", "value": now}
-            ]
-        })
-        
+        payload = ending_soon_payload(limit)
+        if _use_fast_decoder():
+            return finding_decoder.find_items("findItemsAdvanced", payload)
+
+        resp = _execute("findItemsAdvanced", payload)
+
         # Handle response structure safely
         if hasattr(resp, 'reply') and hasattr(resp.reply, 'searchResult'):
             search_result = resp.reply.searchResult
@@ -27,19 +131,21 @@ def search_ending_soon(limit=25):
             print("No search results found in response")
             items = []
         return items
-    except ConnectionError as e:
+    except (ConnectionError, FindingError, FixtureMissing, ResilienceError, requests.RequestException) as e:
         print("Finding API error:", e)
         return []
 
 def search_completed(title, limit=25):
+    """Sold prices of completed listings matching title, or None if the lookup failed."""
     # Legacy Finding API for completed listings
     try:
-        api = Finding(appid=config.APP_ID, siteid="EBAY-US", api_version="1.13.0", config_file=None, domain="svcs.sandbox.ebay.com")
-        resp = api.execute("findCompletedItems", {
-            "keywords": title,
-            "paginationInput": {"entriesPerPage": limit}
-        })
-        
+        payload = completed_payload(title, limit)
+        if _use_fast_decoder():
+            items = finding_decoder.find_items("findCompletedItems", payload, hedge=True)
+            return [i.price for i in items if i.price is not None]
+
+        resp = _execute("findCompletedItems", payload, hedge=True)
+
         # Handle response structure safely
         if hasattr(resp, 'reply') and hasattr(resp.reply, 'searchResult'):
             search_result = resp.reply.searchResult
@@ -47,18 +153,121 @@ def search_completed(title, limit=25):
         else:
             items = []
         return [float(i.sellingStatus.currentPrice.value) for i in items]
-    except ConnectionError as e:
+    except (ConnectionError, FindingError, FixtureMissing, ResilienceError, requests.RequestException) as e:
+        # Not the same as "no comps": the caller mustn't remember this as an answer
         print("Finding API error:", e)
-        return []
+        return None
+
+_app_token = None
+_app_token_expires = 0.0
+_app_token_lock = threading.Lock()
+
+def app_token():
+    """Return an OAuth application token (client credentials grant), cached until shortly before it expires."""
+    global _app_token, _app_token_expires
+    with _app_token_lock:
+        if _app_token is None or time.monotonic() >= _app_token_expires:
+            resp = requests.post(config.EBAY_OAUTH_URL, auth=(config.CLIENT_ID, config.CLIENT_SECRET),
+                                 data={"grant_type": "client_credentials",
+                                       "scope": "https://api.ebay.com/oauth/api_scope"},
+                                 timeout=config.EBAY_CALL_TIMEOUT)
+            resp.raise_for_status()
+            body = resp.json()
+            _app_token = body["access_token"]
+            _app_token_expires = time.monotonic() + int(body.get("expires_in", 7200)) - 60
+        return _app_token
+
+def current_prices(item_ids):
+    """Return {item_id: current price} for the given listings, asking the Shopping API 20 at a time."""
+    from ebaysdk.shopping import Connection as Shopping
+    prices = {}
+    item_ids = list(item_ids)
+    if config.FIXTURE_MODE == "offline":
+        # Only Finding traffic is recorded, so offline mode has nothing to serve these from
+        return prices
+    try:
+        token = app_token()
+    except (requests.RequestException, KeyError, ValueError) as e:
+        print("eBay OAuth token error:", e)
+        return prices
+    for start in range(0, len(item_ids), 20):
+        def attempt(remaining, batch=item_ids[start:start + 20]):
+            api = Shopping(appid=config.APP_ID, iaf_token=token, siteid="0", config_file=None,
+                           domain=config.SHOPPING_DOMAIN, timeout=remaining)
+            return sdk_execute(api, "GetMultipleItems", {"ItemID": batch})
+        try:
+            resp = resilience.call(attempt, retry_on=RETRYABLE, breaker=resilience.get_breaker("shopping"))
+        except (ConnectionError, ResilienceError, requests.RequestException) as e:
+            print("Shopping API error:", e)
+            continue
+        items = getattr(resp.reply, 'Item', None) or []
+        # ebaysdk hands back a single object rather than a list when only one item matches
+        for item in items if isinstance(items, list) else [items]:
+            prices[item.ItemID] = float(item.ConvertedCurrentPrice.value)
+    return prices
+
+def score(price, avg, ratio=config.UNDERVALUE_RATIO):
+    return bool(avg) and price is not None and price < avg * ratio
+
+def stats_from(comps):
+    """(average, count) for a list of sold prices, or None for a failed lookup."""
+    if comps is None:
+        return None
+    return (sum(comps)/len(comps) if comps else 0), len(comps)
+
+def comp_stats(title):
+    return stats_from(search_completed(title))
 
 def is_undervalued(item, ratio=config.UNDERVALUE_RATIO):
-    title = item.title
-    current = float(item.price.value)
-    comps = search_completed(title)
-    avg = sum(comps)/len(comps) if comps else 0
-    return avg and current < avg * ratio
+    avg, _ = comp_stats(item.title) or (0, 0)
+    return score(item_price(item), avg, ratio)
+
+def evaluate(item, stats, cached=False, memo=None, ratio=config.UNDERVALUE_RATIO, rules=None, endgame=None):
+    """Score an item against its comp stats, the global ratio and any watch rules.
+
+    stats is None when the comp lookup failed: the item is still checked
+    against rules that don't need comps, but nothing is memoized, so the next
+    poll tries the lookup again. With an `endgame` AuctionQueue, deals and
+    near-deals are also queued for re-checks just before they end.
+    """
+    price = item_price(item)
+    avg, count = stats or (0, 0)
+    flag = score(price, avg, ratio)
+    if memo is not None and stats is not None:
+        memo.record(item_id(item), price, avg, count, flag, item_end_time(item), refreshed=not cached)
+    matched = rules.match(item.title, item_category(item), item_condition(item), price, avg) if rules is not None else []
+    # Only deals and near-deals are worth re-checking before they close
+    if endgame is not None and (matched or score(price, avg, ratio * config.ENDGAME_MARGIN)):
+        endgame.push(Candidate(item_id(item), item.title, item_url(item), item_category(item), item_condition(item),
+                               price, avg, count, item_end_time(item)))
+    return Evaluation(item, avg, flag, matched)
+
+def evaluate_listings(items, memo=None, ratio=config.UNDERVALUE_RATIO, rules=None, budget=None, endgame=None):
+    """Return Evaluations for items worth alerting on, only fetching comps the memo can't supply.
+
+    Once `budget` seconds (default SCAN_CYCLE_BUDGET) are used up, listings
+    that would need a comp lookup are skipped until the next cycle.
+    """
+    deadline = resilience.Deadline(config.SCAN_CYCLE_BUDGET if budget is None else budget)
+    results = []
+    skipped = 0
+    for item in items:
+        stats = memo.comps(item_id(item)) if memo is not None else None
+        cached = stats is not None
+        if not cached:
+            if deadline.expired():
+                skipped += 1
+                continue
+            stats = comp_stats(item.title)
+        result = evaluate(item, stats, cached, memo, ratio, rules, endgame)
+        if result.undervalued or result.rules:
+            results.append(result)
+    if skipped:
+        print(f"Scan budget used up, skipped {skipped} listings")
+    return results
 
 if __name__ == "__main__":
     for it in search_ending_soon():
-        if is_undervalued(it):
-            print(f"🔥 {it.title}: ${it.price.value} vs avg ${(sum(search_completed(it.title))/len(search_completed(it.title))):.2f}")
+        stats = comp_stats(it.title)
+        if stats and score(item_price(it), stats[0]):
+            print(f"🔥 {it.title}: ${item_price(it)} vs avg ${stats[0]:.2f}")
@@ -0,0 +1,115 @@
+# watchlist.py
+# User-defined watch rules, compiled into an index so each scanned listing is
+# matched against every rule without looping over them.
+#
+# A rule can have keywords, a category, a max price, an undervalue ratio and a
+# condition. Rules with keywords are indexed under their longest keyword (the
+# most selective one) in a character trie; a keyword ending in "*" is a prefix
+# match. Rules without keywords are indexed by category, or kept in a small
+# catch-all list when they have neither. A rule must set at least one
+# condition, so nothing becomes an accidental match-everything rule. Matching a listing walks the trie once
+# per title token, so the cost depends on the title length rather than on the
+# number of rules; only the handful of candidates found there are checked in
+# full.
+import re
+from collections import namedtuple
+
+Rule = namedtuple("Rule", ["id", "name", "keywords", "category_id", "max_price", "ratio", "condition"])
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+\*?")
+_EXACT = "$"
+_PREFIX = "*"
+
+
+def tokenize(text):
+    return _TOKEN_RE.findall((text or "").lower())
+
+
+class RuleError(ValueError):
+    pass
+
+
+def make_rule(id, name=None, keywords=None, category_id=None, max_price=None, ratio=None, condition=None):
+    """Build a Rule, raising RuleError if it would match every listing by accident."""
+    tokens = tuple(k for k in tokenize(keywords) if k != "*")
+    if keywords and keywords.strip() and not tokens:
+        raise RuleError(f"keywords {keywords!r} contain no letters or digits to match on")
+    rule = Rule(id, name or f"rule {id}", tokens, category_id or None,
+                max_price, ratio, (condition or "").lower() or None)
+    if not (rule.keywords or rule.category_id or rule.max_price is not None or rule.ratio is not None or rule.condition):
+        raise RuleError("a rule needs keywords, category_id, max_price, ratio or condition")
+    return rule
+
+
+class RuleIndex:
+    def __init__(self, rules=()):
+        self._trie = {}
+        self._by_category = {}
+        self._catch_all = []
+        self.size = 0
+        for rule in rules:
+            self.add(rule)
+
+    def add(self, rule):
+        self.size += 1
+        if not rule.keywords:
+            if rule.category_id:
+                self._by_category.setdefault(rule.category_id, []).append(rule)
+            else:
+                self._catch_all.append(rule)
+            return
+        anchor = max(rule.keywords, key=lambda k: len(k.rstrip("*")))
+        node = self._trie
+        for char in anchor.rstrip("*"):
+            node = node.setdefault(char, {})
+        node.setdefault(_PREFIX if anchor.endswith("*") else _EXACT, []).append(rule)
+
+    def _candidates(self, tokens, category_id):
+        seen = set()
+        for token in tokens:
+            node = self._trie
+            for char in token:
+                node = node.get(char)
+                if node is None:
+                    break
+                for rule in node.get(_PREFIX, ()):
+                    if rule.id not in seen:
+                        seen.add(rule.id)
+                        yield rule
+            else:
+                for rule in node.get(_EXACT, ()):
+                    if rule.id not in seen:
+                        seen.add(rule.id)
+                        yield rule
+        yield from self._by_category.get(category_id, ())
+        yield from self._catch_all
+
+    def match(self, title, category_id=None, condition=None, price=None, comp_avg=None):
+        """Return the rules a listing satisfies.
+
+        Rules with a ratio only match when comp_avg is known and the price is
+        below comp_avg * ratio.
+        """
+        tokens = {t.rstrip("*") for t in tokenize(title)}
+        condition = (condition or "").lower()
+        matched = []
+        for rule in self._candidates(tokens, category_id):
+            if rule.category_id and rule.category_id != category_id:
+                continue
+            if rule.condition and rule.condition != condition:
+                continue
+            if rule.max_price is not None and (price is None or price > rule.max_price):
+                continue
+            if rule.ratio is not None and (not comp_avg or price is None or price >= comp_avg * rule.ratio):
+                continue
+            if not all(_keyword_matches(k, tokens) for k in rule.keywords):
+                continue
+            matched.append(rule)
+        return matched
+
+
+def _keyword_matches(keyword, tokens):
+    if keyword.endswith("*"):
+        prefix = keyword[:-1]
+        return any(t.startswith(prefix) for t in tokens)
+    return keyword in tokens
@@ -0,0 +1,18 @@
+# worker.py
+# Background worker entry point: polls eBay on a schedule without serving HTTP.
+# Run with: python -m src.worker
+from datetime import datetime
+from .env import load_env
+
+def main():
+    from apscheduler.schedulers.blocking import BlockingScheduler
+    load_env()
+    # Imported after load_env(): src.config reads the environment when first imported
+    from .app import create_app, poll_ebay
+    app = create_app(run_scheduler=False)
+    scheduler = BlockingScheduler()
+    scheduler.add_job(poll_ebay, "interval", minutes=5, args=[app], next_run_time=datetime.now())
+    scheduler.start()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,9 @@
+# wsgi.py
+# Web entry point: gunicorn src.wsgi:app
+from .env import load_env
+
+load_env()
+
+from .app import create_app  # noqa: E402 - needs .env loaded first
+
+app = create_app()
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Finding Response Decoder Benchmark
+Compares ebaysdk's response parsing against finding_decoder on multi-page
+Finding API responses.
+
+Usage:
+    python tests/benchmark_decoder.py                 # synthetic 100-item pages
+    python tests/benchmark_decoder.py recorded_dir/   # recorded *.xml / *.json pages
+"""
+
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from src import finding_decoder
+
+CALL = "findItemsAdvanced"
+NS = "http://www.ebay.com/marketplace/search/v1/services"
+
+
+def synthetic_item(n):
+    return {
+        "itemId": str(110000000000 + n),
+        "title": f"Vintage Camera Lens {n} 50mm f/1.8 Tested",
+        "categoryId": str(3323 + n % 7),
+        "url": f"https://www.ebay.com/itm/{110000000000 + n}",
+        "price": f"{10 + n % 400}.{n % 100:02d}",
+        "endTime": f"2025-08-05T19:{n % 60:02d}:00.000Z",
+        "productId": str(885909950805 + n),
+    }
+
+
+def synthetic_xml_page(page, per_page, total_pages):
+    items = []
+    for n in range(page * per_page, (page + 1) * per_page):
+        it = synthetic_item(n)
+        items.append(
+            f"<item><itemId>{it['itemId']}</itemId><title>{it['title']}</title><globalId>EBAY-US</globalId>"
+            f"<primaryCategory><categoryId>{it['categoryId']}</categoryId><categoryName>Lenses</categoryName></primaryCategory>"
+            f"<galleryURL>https://thumbs.ebaystatic.com/{it['itemId']}.jpg</galleryURL>"
+            f"<viewItemURL>{it['url']}</viewItemURL><productId type=\"ReferenceID\">{it['productId']}</productId>"
+            f"<location>Austin,TX,USA</location><country>US</country>"
+            f"<shippingInfo><shippingServiceCost currencyId=\"USD\">0.0</shippingServiceCost><shippingType>Free</shippingType></shippingInfo>"
+            f"<sellingStatus><currentPrice currencyId=\"USD\">{it['price']}</currentPrice>"
+            f"<convertedCurrentPrice currencyId=\"USD\">{it['price']}</convertedCurrentPrice>"
+            f"<bidCount>3</bidCount><sellingState>Active</sellingState><timeLeft>PT5M</timeLeft></sellingStatus>"
+            f"<listingInfo><bestOfferEnabled>false</bestOfferEnabled><buyItNowAvailable>false</buyItNowAvailable>"
+            f"<startTime>2025-07-29T19:00:00.000Z</startTime><endTime>{it['endTime']}</endTime>"
+            f"<listingType>Auction</listingType><gift>false</gift></listingInfo>"
+            f"<condition><conditionId>3000</conditionId><conditionDisplayName>Used</conditionDisplayName></condition>"
+            f"</item>"
+        )
+    return (
+        f"<?xml version='1.0' encoding='UTF-8'?><{CALL}Response xmlns=\"{NS}\">"
+        f"<ack>Success</ack><version>1.13.0</version><timestamp>2025-08-05T19:00:00.000Z</timestamp>"
+        f"<searchResult count=\"{per_page}\">{''.join(items)}</searchResult>"
+        f"<paginationOutput><pageNumber>{page + 1}</pageNumber><entriesPerPage>{per_page}</entriesPerPage>"
+        f"<totalPages>{total_pages}</totalPages><totalEntries>{per_page * total_pages}</totalEntries></paginationOutput>"
+        f"</{CALL}Response>"
+    ).encode("utf-8")
+
+
+def synthetic_json_page(page, per_page, total_pages):
+    import json
+
+    def wrap(value):
+        return [value]
+
+    items = []
+    for n in range(page * per_page, (page + 1) * per_page):
+        it = synthetic_item(n)
+        items.append({
+            "itemId": wrap(it["itemId"]),
+            "title": wrap(it["title"]),
+            "globalId": wrap("EBAY-US"),
+            "primaryCategory": wrap({"categoryId": wrap(it["categoryId"]), "categoryName": wrap("Lenses")}),
+            "viewItemURL": wrap(it["url"]),
+            "productId": wrap({"@type": "ReferenceID", "__value__": it["productId"]}),
+            "sellingStatus": wrap({
+                "currentPrice": wrap({"@currencyId": "USD", "__value__": it["price"]}),
+                "bidCount": wrap("3"),
+                "sellingState": wrap("Active"),
+                "timeLeft": wrap("PT5M"),
+            }),
+            "listingInfo": wrap({"listingType": wrap("Auction"), "endTime": wrap(it["endTime"])}),
+            "condition": wrap({"conditionId": wrap("3000"), "conditionDisplayName": wrap("Used")}),
+        })
+    body = {f"{CALL}Response": wrap({
+        "ack": wrap("Success"),
+        "searchResult": wrap({"@count": str(per_page), "item": items}),
+        "paginationOutput": wrap({"pageNumber": wrap(str(page + 1)), "totalPages": wrap(str(total_pages))}),
+    })}
+    return json.dumps(body).encode("utf-8")
+
+
+def load_pages(directory):
+    xml_pages, json_pages = [], []
+    for name in sorted(os.listdir(directory)):
+        with open(os.path.join(directory, name), "rb") as f:
+            if name.endswith(".xml"):
+                xml_pages.append(f.read())
+            elif name.endswith(".json"):
+                json_pages.append(f.read())
+    return xml_pages, json_pages
+
+
+def timed(label, pages, parse, rounds):
+    start = time.perf_counter()
+    count = 0
+    for _ in range(rounds):
+        for body in pages:
+            count += parse(body)
+    elapsed = time.perf_counter() - start
+    per_page = elapsed / (rounds * len(pages)) * 1000
+    print(f"   {label:<28} {per_page:8.3f} ms/page   ({count // rounds} items/round)")
+    return per_page
+
+
+def ebaysdk_parser():
+    """Return a parse function using ebaysdk's own Response class, or None if unavailable."""
+    try:
+        from ebaysdk.finding import Connection as Finding
+        from ebaysdk.response import Response
+    except ImportError:
+        return None
+
+    api = Finding(appid="benchmark", config_file=None)
+    list_nodes = getattr(api, "base_list_nodes", [])
+    datetime_nodes = getattr(api, "datetime_nodes", [])
+
+    def parse(body):
+        resp = Response(SimpleNamespace(content=body), verb=CALL,
+                        list_nodes=list_nodes, datetime_nodes=datetime_nodes)
+        result = resp.reply.searchResult
+        items = result.item if hasattr(result, "item") else []
+        # Touch the same fields the scanner reads
+        for i in items:
+            (i.itemId, i.title, i.sellingStatus.currentPrice.value, i.viewItemURL, i.listingInfo.endTime)
+        return len(items)
+
+    return parse
+
+
+if __name__ == "__main__":
+    print("⏱️  Finding Response Decoder Benchmark")
+    print("=" * 50)
+
+    if len(sys.argv) > 1:
+        xml_pages, json_pages = load_pages(sys.argv[1])
+        print(f"📂 Loaded {len(xml_pages)} XML and {len(json_pages)} JSON recorded pages")
+    else:
+        total_pages, per_page = 5, 100
+        xml_pages = [synthetic_xml_page(p, per_page, total_pages) for p in range(total_pages)]
+        json_pages = [synthetic_json_page(p, per_page, total_pages) for p in range(total_pages)]
+        print(f"🧪 Using {total_pages} synthetic pages of {per_page} items")
+
+    rounds = int(os.getenv("BENCH_ROUNDS", "20"))
+    results = {}
+
+    if xml_pages:
+        print("\n📄 XML responses")
+        sdk_parse = ebaysdk_parser()
+        if sdk_parse:
+            results["ebaysdk"] = timed("ebaysdk Response", xml_pages, sdk_parse, rounds)
+        else:
+            print("   ebaysdk not installed, skipping baseline")
+        results["xml"] = timed("finding_decoder.parse_xml", xml_pages,
+                               lambda b: len(finding_decoder.parse_xml(b)[0]), rounds)
+
+    if json_pages:
+        print("\n📄 JSON responses")
+        results["json"] = timed("finding_decoder.parse_json", json_pages,
+                                lambda b: len(finding_decoder.parse_json(b, CALL)[0]), rounds)
+
+    if "ebaysdk" in results:
+        print("\n📊 Speedup vs ebaysdk")
+        for key in ("xml", "json"):
+            if key in results:
+                print(f"   {key:<6} {results['ebaysdk'] / results[key]:6.1f}x")
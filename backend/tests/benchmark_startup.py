@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Backend Startup Benchmark
+Measures cold-start time and peak memory for each process role by running it
+in a fresh interpreter, the way a container or gunicorn worker would.
+
+Usage:
+    python tests/benchmark_startup.py [runs]
+"""
+
+import os
+import statistics
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+# Each snippet prints its peak RSS in KB (ru_maxrss is KB on Linux)
+RSS = "import resource; print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)"
+
+SCENARIOS = [
+    ("import src.models (alembic)", "import src.models"),
+    ("import src.app (tooling)", "import src.app"),
+    ("create_app() (web worker)", "from src.app import create_app; create_app(run_scheduler=False)"),
+    ("create_app() + scheduler", "from src.app import create_app; create_app(run_scheduler=True)"),
+]
+
+
+def run_once(code):
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1")
+    script = f"import time; t = time.perf_counter(); {code}; print(time.perf_counter() - t); {RSS}"
+    result = subprocess.run([sys.executable, "-c", script], cwd=BACKEND_DIR, env=env,
+                            capture_output=True, text=True, timeout=60)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr else "failed")
+    lines = result.stdout.strip().splitlines()
+    return float(lines[-2]), int(lines[-1])
+
+
+if __name__ == "__main__":
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    print("🚀 Backend Startup Benchmark")
+    print("=" * 50)
+    print(f"   {'scenario':<30} {'median ms':>10} {'max RSS MB':>11}")
+
+    for label, code in SCENARIOS:
+        try:
+            samples = [run_once(code) for _ in range(runs)]
+        except Exception as e:
+            print(f"   {label:<30} ❌ {e}")
+            continue
+        median_ms = statistics.median(s[0] for s in samples) * 1000
+        rss_mb = max(s[1] for s in samples) / 1024
+        print(f"   {label:<30} {median_ms:10.1f} {rss_mb:11.1f}")
@@ -0,0 +1,9 @@
+# conftest.py
+# The pytest cases here run without network or a database. The other scripts
+# in this directory talk to eBay or Postgres and are run by hand.
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+collect_ignore = ["diagnostic_test.py", "test_connection.py"]
@@ -4,6 +4,8 @@ eBay API Diagnostic Test
 Helps diagnose eBay API configuration issues
 """
 
+from dotenv import load_dotenv
+load_dotenv()  # before config, which reads the environment when imported
 import config
 from ebaysdk.finding import Connection as Finding
 from ebaysdk.exception import ConnectionError
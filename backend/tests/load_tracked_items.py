@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+tracked_items Load Test
+Seeds tracked_items with realistic synthetic rows using COPY, then reports
+query plans and timings for the scanner's and listings page's hot queries.
+
+Typical before/after run:
+    python tests/load_tracked_items.py seed --rows 5000000
+    python tests/load_tracked_items.py report --label before
+    alembic upgrade head
+    python tests/load_tracked_items.py report --label after
+    python tests/load_tracked_items.py clean
+
+Uses the DB_HOST / DB_USER / DB_PASSWORD / DB_NAME settings from .env.
+"""
+
+import argparse
+import itertools
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+import psycopg
+from dotenv import load_dotenv
+
+ID_PREFIX = "load-"
+
+WORDS = {
+    "brand": ["Apple", "Canon", "Nikon", "Sony", "Lego", "Nintendo", "Fender", "Rolex", "Seiko", "Bose", "Dyson", "KitchenAid"],
+    "thing": ["iPhone", "Lens", "Camera", "Set", "Console", "Guitar", "Watch", "Headphones", "Vacuum", "Mixer", "Controller", "Tripod"],
+    "detail": ["50mm", "128GB", "Vintage", "Sealed", "Bundle", "Pro", "Mint", "Tested", "Boxed", "Limited Edition", "Refurbished", "Parts"],
+}
+
+# (label, SQL, params) - the scanner, listings page and export access paths
+HOT_QUERIES = [
+    ("ending soon (10 min window)",
+     "SELECT * FROM tracked_items WHERE end_time BETWEEN (now() AT TIME ZONE 'utc') "
+     "AND (now() AT TIME ZONE 'utc') + interval '10 minutes' ORDER BY end_time", None),
+    ("listings page (first 100 by end_time)",
+     "SELECT * FROM tracked_items ORDER BY end_time LIMIT 100", None),
+    ("category, active, by end_time",
+     "SELECT * FROM tracked_items WHERE category_id = %s AND end_time > (now() AT TIME ZONE 'utc') "
+     "ORDER BY end_time LIMIT 100", ("9355",)),
+    ("stale re-check (last_checked > 1h ago)",
+     "SELECT id FROM tracked_items WHERE last_checked < (now() AT TIME ZONE 'utc') - interval '1 hour' "
+     "ORDER BY last_checked LIMIT 500", None),
+    ("incremental export since watermark",
+     "SELECT * FROM tracked_items WHERE last_checked > (now() AT TIME ZONE 'utc') - interval '5 minutes' "
+     "ORDER BY last_checked", None),
+    ("product lookup by UPC",
+     "SELECT * FROM tracked_items WHERE upc = %s", ("885909950805",)),
+]
+
+
+def connect():
+    load_dotenv()
+    return psycopg.connect(
+        host=os.getenv("DB_HOST"), user=os.getenv("DB_USER"),
+        password=os.getenv("DB_PASSWORD"), dbname=os.getenv("DB_NAME"),
+    )
+
+
+def digits(rng, n):
+    return f"{rng.randrange(10 ** n):0{n}d}"
+
+
+def generate_rows(count, seed=42):
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    # A few hundred categories with a long tail, like real eBay traffic
+    categories = [str(c) for c in rng.sample(range(1, 200000), 500)]
+    cum_weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(categories))))
+    categories[0] = "9355"  # make sure the category query hits a busy one
+    for n in range(count):
+        title = f"{rng.choice(WORDS['brand'])} {rng.choice(WORDS['thing'])} {rng.choice(WORDS['detail'])} {n % 997}"
+        end_time = now + timedelta(seconds=rng.randint(-7 * 86400, 7 * 86400))
+        yield (
+            f"{ID_PREFIX}{n}",
+            title,
+            round(rng.lognormvariate(3.5, 1.0), 2),
+            end_time,
+            digits(rng, 12) if rng.random() < 0.3 else None,
+            digits(rng, 13) if rng.random() < 0.1 else None,
+            digits(rng, 14) if rng.random() < 0.1 else None,
+            rng.choices(categories, cum_weights=cum_weights)[0],
+            now - timedelta(seconds=rng.randint(0, 2 * 86400)),
+        )
+
+
+def seed(rows, batch):
+    started = time.perf_counter()
+    with connect() as conn, conn.cursor() as cur:
+        with cur.copy("COPY tracked_items (id, title, current_price, end_time, upc, ean, gtin, category_id, last_checked) "
+                      "FROM STDIN") as copy:
+            for n, row in enumerate(generate_rows(rows), 1):
+                copy.write_row(row)
+                if n % batch == 0:
+                    print(f"   {n:>12,} rows  ({n / (time.perf_counter() - started):,.0f} rows/s)")
+        cur.execute("ANALYZE tracked_items")
+    elapsed = time.perf_counter() - started
+    print(f"✅ Loaded {rows:,} rows in {elapsed:.1f}s ({rows / elapsed:,.0f} rows/s)")
+
+
+def report(label, runs):
+    print(f"📊 Hot query report: {label}")
+    print("=" * 70)
+    with connect() as conn, conn.cursor() as cur:
+        cur.execute("SELECT count(*) FROM tracked_items")
+        print(f"tracked_items rows: {cur.fetchone()[0]:,}")
+        cur.execute("SELECT indexname FROM pg_indexes WHERE tablename = 'tracked_items' ORDER BY indexname")
+        print(f"indexes: {', '.join(r[0] for r in cur.fetchall())}")
+        for name, sql, params in HOT_QUERIES:
+            cur.execute(f"EXPLAIN (ANALYZE, BUFFERS) {sql}", params)
+            plan = [r[0] for r in cur.fetchall()]
+            timings = []
+            for _ in range(runs):
+                start = time.perf_counter()
+                cur.execute(sql, params)
+                cur.fetchall()
+                timings.append((time.perf_counter() - start) * 1000)
+            timings.sort()
+            print(f"\n🔎 {name}")
+            print(f"   median {timings[len(timings) // 2]:.2f} ms, best {timings[0]:.2f} ms over {runs} runs")
+            for line in plan:
+                print(f"   {line}")
+
+
+def clean():
+    with connect() as conn, conn.cursor() as cur:
+        cur.execute("DELETE FROM tracked_items WHERE id LIKE %s", (ID_PREFIX + "%",))
+        print(f"🧹 Removed {cur.rowcount:,} load-test rows")
+        conn.commit()
+        conn.autocommit = True
+        cur.execute("VACUUM ANALYZE tracked_items")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+    seed_parser = sub.add_parser("seed", help="COPY synthetic rows into tracked_items")
+    seed_parser.add_argument("--rows", type=int, default=1_000_000)
+    seed_parser.add_argument("--progress", type=int, default=250_000, help="Print progress every N rows")
+    report_parser = sub.add_parser("report", help="EXPLAIN ANALYZE and time the hot queries")
+    report_parser.add_argument("--label", default="current schema")
+    report_parser.add_argument("--runs", type=int, default=5)
+    sub.add_parser("clean", help="Delete the load-test rows")
+    args = parser.parse_args()
+
+    try:
+        if args.command == "seed":
+            seed(args.rows, args.progress)
+        elif args.command == "report":
+            report(args.label, args.runs)
+        else:
+            clean()
+    except psycopg.Error as e:
+        print(f"❌ Database error: {e}")
+        sys.exit(1)
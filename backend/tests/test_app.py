@@ -0,0 +1,38 @@
+import os
+import subprocess
+import sys
+
+from src import app as app_module
+from src import config
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_scheduler_follows_run_scheduler_unless_told_otherwise(monkeypatch):
+    started = []
+    monkeypatch.setattr(app_module, "start_scheduler", started.append)
+    monkeypatch.setattr(config, "RUN_SCHEDULER", True)
+    web = app_module.create_app()
+    assert started == [web]
+    # The worker and `flask --app "src.app:create_app(run_scheduler=False)" export`
+    app_module.create_app(run_scheduler=False)
+    assert started == [web]
+
+    monkeypatch.setattr(config, "RUN_SCHEDULER", False)
+    app_module.create_app()
+    assert started == [web]
+
+
+def test_entry_points_see_dotenv_values_captured_at_import(tmp_path):
+    # Under -c there is no __main__ file, so find_dotenv() searches from the working directory
+    (tmp_path / ".env").write_text("PROFILE_MODE=sample\nPROFILE_RATE=0.5\n")
+    script = (
+        "from src.env import load_env; load_env()\n"
+        "from src import profiling\n"
+        "print(profiling.settings['mode'], profiling.settings['rate'])\n"
+    )
+    env = {k: v for k, v in os.environ.items() if not k.startswith("PROFILE_")}
+    env["PYTHONPATH"] = BACKEND
+    out = subprocess.run([sys.executable, "-c", script], cwd=tmp_path, env=env,
+                         capture_output=True, text=True, check=True).stdout
+    assert out.split() == ["sample", "0.5"]
@@ -5,6 +5,8 @@ Tests the eBay Finding API connection using your configured credentials.
 """
 
 import sys
+from dotenv import load_dotenv
+load_dotenv()  # before config, which reads the environment when imported
 import config
 from ebaysdk.finding import Connection as Finding
 from ebaysdk.exception import ConnectionError
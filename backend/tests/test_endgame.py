@@ -0,0 +1,127 @@
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+
+from src.endgame import AuctionQueue, Candidate, TimerWheel
+
+NOW = 1_000_000.0
+
+
+def at(seconds):
+    return datetime.fromtimestamp(NOW + seconds, timezone.utc)
+
+
+def candidate(item_id, ends_in, price=10.0):
+    return Candidate(item_id, f"Item {item_id}", f"https://ebay.example/{item_id}", None, None,
+                     price, 50.0, 3, at(ends_in))
+
+
+def test_wheel_fires_timers_in_order_of_ticks():
+    wheel = TimerWheel(tick=1, slots=8, now=NOW)
+    for offset in (5, 1, 3):
+        wheel.schedule(NOW + offset, offset)
+    assert wheel.next_due() == NOW + 1
+    assert wheel.advance(NOW + 2) == [1]
+    assert wheel.next_due() == NOW + 3
+    assert sorted(wheel.advance(NOW + 5)) == [3, 5]
+    assert len(wheel) == 0
+    assert wheel.next_due() is None
+
+
+def test_wheel_keeps_timers_for_later_laps():
+    wheel = TimerWheel(tick=1, slots=8, now=NOW)
+    # Same bucket as NOW + 2, but two laps later
+    wheel.schedule(NOW + 18, "late")
+    wheel.schedule(NOW + 2, "soon")
+    assert wheel.next_due() == NOW + 2
+    assert wheel.advance(NOW + 10) == ["soon"]
+    assert wheel.next_due() == NOW + 18
+    assert wheel.advance(NOW + 17) == []
+    assert wheel.advance(NOW + 18) == ["late"]
+
+
+def test_wheel_catches_up_after_a_long_sleep():
+    wheel = TimerWheel(tick=1, slots=8, now=NOW)
+    for offset in range(0, 40, 3):
+        wheel.schedule(NOW + offset, offset)
+    assert sorted(wheel.advance(NOW + 100)) == list(range(0, 40, 3))
+    assert len(wheel) == 0
+
+
+def test_wheel_fires_overdue_timers_on_next_advance():
+    wheel = TimerWheel(tick=1, slots=8, now=NOW)
+    wheel.schedule(NOW - 50, "overdue")
+    assert wheel.advance(NOW) == ["overdue"]
+
+
+def test_queue_rechecks_at_each_offset_and_expires():
+    checks = []
+
+    def check(candidates, offset):
+        checks.append((offset, [c.item_id for c in candidates]))
+        return [c._replace(price=c.price + 5) for c in candidates]
+
+    queue = AuctionQueue(check, offsets=(30, 120), tick=1)
+    queue.wheel = TimerWheel(tick=1, now=NOW)
+    queue.push(candidate("a", 200), now=NOW)
+    # Too close to the end for the T-120s re-check
+    queue.push(candidate("b", 60), now=NOW)
+
+    assert queue.due(NOW + 20) == {}
+    queue.run_once(NOW + 31)
+    assert checks == [(30, ["b"])]
+    queue.run_once(NOW + 81)
+    assert checks == [(30, ["b"]), (120, ["a"])]
+    assert len(queue) == 1
+    queue.run_once(NOW + 171)
+    assert checks[-1] == (30, ["a"])
+    assert queue._entries["a"].price == 20.0
+    queue.run_once(NOW + 201)
+    assert len(queue) == 0
+    changed, removed = queue.drain()
+    assert sorted(removed) == ["a", "b"]
+
+
+def test_queue_push_refreshes_without_rescheduling():
+    queue = AuctionQueue(lambda candidates, offset: None, offsets=(30,), tick=1)
+    queue.wheel = TimerWheel(tick=1, now=NOW)
+    queue.push(candidate("a", 100), now=NOW)
+    queue.push(candidate("a", 100, price=12.0), now=NOW + 5)
+    assert len(queue.wheel) == 1
+    changed, _ = queue.drain()
+    assert [c.price for c in changed] == [12.0]
+
+
+def test_queue_load_restores_live_and_removes_ended():
+    queue = AuctionQueue(lambda candidates, offset: None, offsets=(30,), tick=1)
+    queue.wheel = TimerWheel(tick=1, now=NOW)
+    queue.load([candidate("live", 100), candidate("ended", -10)], now=NOW)
+    assert len(queue) == 1
+    assert queue.drain() == ([], ["ended"])
+    assert [c.item_id for c in queue.due(NOW + 71)[30]] == ["live"]
+
+
+def test_queue_thread_logs_check_errors_and_keeps_running(caplog):
+    calls = threading.Event()
+
+    def check(candidates, offset):
+        calls.set()
+        raise RuntimeError("Shopping API down")
+
+    queue = AuctionQueue(check, offsets=(1,), tick=0.05)
+    end = datetime.fromtimestamp(time.time() + 1.2, timezone.utc)
+    queue.push(Candidate("1", "Item 1", "https://ebay.example/1", None, None, 10.0, 50.0, 3, end))
+    with caplog.at_level(logging.ERROR):
+        queue.start()
+        try:
+            assert calls.wait(5)
+            deadline = time.time() + 5
+            while not caplog.records and time.time() < deadline:
+                time.sleep(0.01)
+            assert queue._thread.is_alive()
+        finally:
+            queue.stop()
+    (log,) = caplog.records
+    assert log.getMessage() == "Endgame re-check error"
+    assert log.exc_info[0] is RuntimeError
@@ -0,0 +1,52 @@
+from datetime import datetime, timedelta, timezone
+
+from src.evaluation_memo import EvaluationMemo
+
+T0 = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def test_comps_are_served_until_the_ttl_passes():
+    memo = EvaluationMemo(comp_ttl=600)
+    assert memo.comps("a", now=T0) is None
+    memo.record("a", 10.0, 50.0, 4, False, T0 + timedelta(hours=1), now=T0)
+    assert memo.comps("a", now=T0 + timedelta(seconds=600)) == (50.0, 4)
+    assert memo.comps("a", now=T0 + timedelta(seconds=601)) is None
+    assert (memo.hits, memo.misses) == (1, 2)
+
+
+def test_cached_rescore_keeps_the_comp_timestamp():
+    memo = EvaluationMemo(comp_ttl=600)
+    memo.record("a", 10.0, 50.0, 4, False, T0 + timedelta(hours=1), now=T0)
+    memo.record("a", 12.0, 50.0, 4, False, T0 + timedelta(hours=1), refreshed=False, now=T0 + timedelta(seconds=300))
+    # Still fresh relative to the original lookup, not the re-score
+    assert memo.comps("a", now=T0 + timedelta(seconds=601)) is None
+    (entry,), _ = memo.drain()
+    assert entry.price == 12.0
+    assert entry.updated_at == T0 + timedelta(seconds=300)
+
+
+def test_only_changed_entries_are_drained():
+    memo = EvaluationMemo(comp_ttl=600)
+    memo.record("a", 10.0, 50.0, 4, False, T0 + timedelta(hours=1), now=T0)
+    memo.drain()
+    memo.record("a", 10.0, 50.0, 4, False, T0 + timedelta(hours=1), refreshed=False, now=T0 + timedelta(seconds=60))
+    assert memo.drain() == ([], [])
+
+
+def test_ended_listings_expire():
+    memo = EvaluationMemo(comp_ttl=600)
+    memo.record("ended", 10.0, 50.0, 4, False, T0 + timedelta(minutes=5), now=T0)
+    memo.record("live", 10.0, 50.0, 4, False, T0 + timedelta(hours=1), now=T0)
+    memo.drain()
+    memo.expire(now=T0 + timedelta(minutes=10))
+    assert len(memo) == 1
+    assert memo.drain() == ([], ["ended"])
+
+
+def test_load_treats_naive_datetimes_as_utc():
+    memo = EvaluationMemo(comp_ttl=600)
+    source = EvaluationMemo(comp_ttl=600)
+    source.record("a", 10.0, 50.0, 4, False, T0 + timedelta(hours=1), now=T0)
+    (entry,), _ = source.drain()
+    memo.load([entry._replace(comps_checked_at=T0.replace(tzinfo=None), end_time=None)])
+    assert memo.comps("a", now=T0 + timedelta(seconds=60)) == (50.0, 4)
@@ -0,0 +1,84 @@
+import json
+
+import pytest
+
+from benchmark_decoder import CALL, NS, synthetic_json_page, synthetic_xml_page
+from src import finding_decoder
+from src.finding_decoder import FindingError, build_params, iter_xml, parse_json, parse_xml
+
+
+def test_json_and_xml_decode_to_the_same_listings():
+    json_listings, json_pages = parse_json(synthetic_json_page(1, 3, 4), CALL)
+    xml_listings, xml_pages = parse_xml(synthetic_xml_page(1, 3, 4))
+    assert json_listings == xml_listings
+    assert json_pages == xml_pages == 4
+    first = json_listings[0]
+    assert first.item_id == "110000000003"
+    assert first.price == 13.03
+    assert first.currency == "USD"
+    assert first.category_id == "3326"
+    assert first.condition == "Used"
+    assert first.end_time.isoformat() == "2025-08-05T19:03:00+00:00"
+
+
+def test_iter_xml_reports_total_pages_after_iteration():
+    response = iter_xml(synthetic_xml_page(0, 2, 7))
+    assert response.total_pages is None
+    assert [listing.item_id for listing in response] == ["110000000000", "110000000001"]
+    assert response.total_pages == 7
+
+
+def test_missing_current_price_decodes_as_none():
+    body = json.loads(synthetic_json_page(0, 1, 1))
+    del body[f"{CALL}Response"][0]["searchResult"][0]["item"][0]["sellingStatus"][0]["currentPrice"]
+    (listing,), _ = parse_json(json.dumps(body), CALL)
+    assert listing.price is None and listing.currency is None
+
+    xml = synthetic_xml_page(0, 1, 1).replace(b'<currentPrice currencyId="USD">10.00</currentPrice>', b"")
+    (listing,), _ = parse_xml(xml)
+    assert listing.price is None and listing.currency is None
+
+
+def test_ack_failure_raises():
+    body = {f"{CALL}Response": [{
+        "ack": ["Failure"],
+        "errorMessage": [{"error": [{"message": ["Invalid app ID"]}]}],
+    }]}
+    with pytest.raises(FindingError, match="Invalid app ID"):
+        parse_json(json.dumps(body), CALL)
+
+    xml = (f'<{CALL}Response xmlns="{NS}"><ack>Failure</ack><errorMessage><error>'
+           f'<message>Invalid app ID</message></error></errorMessage></{CALL}Response>').encode()
+    with pytest.raises(FindingError, match="Invalid app ID"):
+        parse_xml(xml)
+
+
+def test_build_params_flattens_nested_payloads():
+    params = build_params("findItemsAdvanced", {
+        "keywords": "lens",
+        "paginationInput": {"entriesPerPage": 100, "pageNumber": 2},
+        "itemFilter": [{"name": "EndTimeTo", "value": "2025-08-05T19:00:00Z"},
+                       {"name": "Condition", "value": ["1000", "3000"]}],
+    }, "XML")
+    assert params["OPERATION-NAME"] == "findItemsAdvanced"
+    assert params["RESPONSE-DATA-FORMAT"] == "XML"
+    assert params["keywords"] == "lens"
+    assert params["paginationInput.entriesPerPage"] == 100
+    assert params["itemFilter(0).name"] == "EndTimeTo"
+    assert params["itemFilter(1).value(1)"] == "3000"
+
+
+@pytest.mark.parametrize("pages, total_pages, fetched", [(1, 5, [1]), (3, 5, [1, 2, 3]), (10, 2, [1, 2])])
+def test_find_items_follows_pages(monkeypatch, pages, total_pages, fetched):
+    requested = []
+
+    def fake_fetch(call, payload, response_format, **kwargs):
+        page = payload["paginationInput"]["pageNumber"]
+        requested.append(page)
+        return synthetic_json_page(page - 1, 2, total_pages)
+
+    monkeypatch.setattr(finding_decoder, "fetch", fake_fetch)
+    listings = finding_decoder.find_items(CALL, {"paginationInput": {"entriesPerPage": 2}}, pages=pages,
+                                          response_format="JSON")
+    assert requested == fetched
+    assert len(listings) == 2 * len(fetched)
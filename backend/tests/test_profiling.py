@@ -0,0 +1,69 @@
+import pytest
+
+from src import config, profiling
+from src.profiling import record, span
+
+
+@pytest.fixture(autouse=True)
+def profile_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "PROFILE_DIR", str(tmp_path))
+    monkeypatch.setitem(profiling.settings, "mode", "cprofile")
+    return tmp_path
+
+
+def test_span_without_a_trace_is_a_no_op():
+    with span("ebay"):
+        pass
+    record("ebay", 1.0)
+    assert profiling.current_trace() is None
+
+
+def test_spans_add_up_per_name(profile_dir):
+    with profiling.profile("scan", sampled=False) as trace:
+        assert profiling.current_trace() is trace
+        for _ in range(2):
+            with span("db"):
+                pass
+        record("ebay", 0.25)
+        record("ebay", 0.5)
+    assert profiling.current_trace() is None
+
+    summary = trace.summary()
+    assert summary["name"] == "scan" and summary["total_ms"] >= 0
+    assert summary["spans"]["ebay"] == {"ms": 750.0, "count": 2}
+    assert summary["spans"]["db"]["count"] == 2
+    # Not sampled, so nothing is written
+    assert list(profile_dir.iterdir()) == []
+
+
+def test_span_records_time_when_the_block_raises():
+    with profiling.profile("scan", sampled=False) as trace:
+        with pytest.raises(KeyError):
+            with span("parse"):
+                raise KeyError("x")
+    assert trace.counts["parse"] == 1
+
+
+def test_busy_profiler_falls_back_to_spans_only(profile_dir):
+    # Another thread's unit already holds the profiler
+    assert profiling._cprofile_lock.acquire(blocking=False)
+    try:
+        assert profiling._start_cprofile("request-home") is None
+        with profiling.profile("request-home", sampled=True) as trace:
+            record("db", 0.1)
+        assert trace.elapsed is not None
+        assert list(profile_dir.iterdir()) == []
+        # The fallback must not release a lock it never took
+        assert profiling._cprofile_lock.locked()
+    finally:
+        profiling._cprofile_lock.release()
+
+
+def test_profiler_hook_taken_by_another_tool_releases_the_lock(monkeypatch):
+    class Held:
+        def enable(self):
+            raise ValueError("Another profiling tool is already active")
+
+    monkeypatch.setattr(profiling.cProfile, "Profile", Held)
+    assert profiling._start_cprofile("scan") is None
+    assert not profiling._cprofile_lock.locked()
@@ -0,0 +1,95 @@
+import pytest
+
+from src import resilience
+from src.resilience import CircuitBreaker, CircuitOpenError
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(resilience.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_breaker_opens_after_consecutive_failures(clock):
+    breaker = CircuitBreaker("test", failure_threshold=3, reset_seconds=30)
+    for _ in range(2):
+        breaker.allow()
+        breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.allow()
+
+
+def test_success_resets_the_failure_count(clock):
+    breaker = CircuitBreaker("test", failure_threshold=2, reset_seconds=30)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_half_open_trial_closes_on_success(clock):
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_seconds=30)
+    breaker.record_failure()
+    clock[0] += 31
+    breaker.allow()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    # Only the trial call gets through until it reports back
+    with pytest.raises(CircuitOpenError):
+        breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.allow()
+
+
+def test_half_open_trial_reopens_on_failure(clock):
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_seconds=30)
+    breaker.record_failure()
+    clock[0] += 31
+    breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.allow()
+
+
+def test_half_open_trial_that_never_reports_back_allows_another(clock):
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_seconds=30)
+    breaker.record_failure()
+    clock[0] += 31
+    breaker.allow()
+    clock[0] += 31
+    breaker.allow()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+
+
+def test_call_retries_then_gives_up(monkeypatch):
+    monkeypatch.setattr(resilience.time, "sleep", lambda seconds: None)
+    breaker = CircuitBreaker("test", failure_threshold=10, reset_seconds=30)
+    attempts = []
+
+    def flaky(remaining):
+        attempts.append(remaining)
+        raise ConnectionError("down")
+
+    with pytest.raises(ConnectionError):
+        resilience.call(flaky, retry_on=(ConnectionError,), breaker=breaker, timeout=60, retries=2)
+    assert len(attempts) == 3
+    assert breaker.failures == 3
+
+
+def test_call_does_not_retry_or_count_other_errors():
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_seconds=30)
+    attempts = []
+
+    def api_error(remaining):
+        attempts.append(remaining)
+        raise ValueError("ack=Failure")
+
+    with pytest.raises(ValueError):
+        resilience.call(api_error, retry_on=(ConnectionError,), breaker=breaker, timeout=60)
+    assert len(attempts) == 1
+    assert breaker.state == CircuitBreaker.CLOSED
@@ -0,0 +1,92 @@
+import time
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+import requests
+
+from src import profiling, scout
+from src.endgame import AuctionQueue
+from src.evaluation_memo import EvaluationMemo
+from src.finding_decoder import Listing
+from src.watchlist import RuleIndex, make_rule
+
+ENDS = datetime.now(timezone.utc) + timedelta(minutes=5)
+
+
+def listing(item_id="1", price=10.0, title="Canon 50mm lens"):
+    return Listing(item_id, title, price, "USD", f"https://ebay.example/{item_id}", ENDS, "625", None, "Used")
+
+
+def test_failed_comp_lookup_is_not_cached(monkeypatch):
+    memo = EvaluationMemo(comp_ttl=1800)
+    monkeypatch.setattr(scout, "search_completed", lambda title, limit=25: None)
+    assert scout.evaluate_listings([listing()], memo) == []
+    assert len(memo) == 0
+    # The next poll retries the lookup instead of trusting the failure
+    assert memo.comps("1") is None
+
+    monkeypatch.setattr(scout, "search_completed", lambda title, limit=25: [40.0, 60.0])
+    (result,) = scout.evaluate_listings([listing()], memo)
+    assert result.undervalued and result.comp_avg == 50.0
+    assert memo.comps("1") == (50.0, 2)
+
+
+def test_zero_comp_answer_is_cached(monkeypatch):
+    memo = EvaluationMemo(comp_ttl=1800)
+    monkeypatch.setattr(scout, "search_completed", lambda title, limit=25: [])
+    assert scout.evaluate_listings([listing()], memo) == []
+    assert memo.comps("1") == (0, 0)
+
+
+def test_rules_still_match_when_comps_fail(monkeypatch):
+    memo = EvaluationMemo(comp_ttl=1800)
+    monkeypatch.setattr(scout, "search_completed", lambda title, limit=25: None)
+    rules = RuleIndex([make_rule(1, "cheap canon", "canon", max_price=20)])
+    (result,) = scout.evaluate_listings([listing()], memo, rules=rules)
+    assert [r.name for r in result.rules] == ["cheap canon"]
+    assert not result.undervalued
+    assert len(memo) == 0
+
+
+def test_near_deals_are_queued_for_endgame_rechecks():
+    queue = AuctionQueue(check=lambda candidates, offset: None, offsets=(30,))
+    scout.evaluate(listing(price=35.0), (50.0, 2), endgame=queue)
+    assert len(queue) == 1
+    scout.evaluate(listing(item_id="2", price=500.0), (50.0, 2), endgame=queue)
+    assert len(queue) == 1
+
+
+def test_listing_without_a_price_is_not_queued_for_endgame_rechecks():
+    queue = AuctionQueue(check=lambda candidates, offset: None, offsets=(30,))
+    result = scout.evaluate(listing(price=None), (50.0, 2), endgame=queue)
+    assert not result.undervalued
+    assert len(queue) == 0
+
+
+class FakeApi:
+    def __init__(self, elapsed=None, error=None):
+        self.elapsed = elapsed
+        self.error = error
+        self.response = None
+
+    def execute(self, call, payload):
+        if self.error is not None:
+            raise self.error
+        self.response = SimpleNamespace(elapsed=timedelta(seconds=self.elapsed))
+        time.sleep(0.01)
+        return self.response
+
+
+def test_sdk_execute_splits_transport_from_parsing():
+    with profiling.profile("scan", sampled=False) as trace:
+        scout.sdk_execute(FakeApi(elapsed=0.002), "findItemsAdvanced", {})
+    assert trace.spans["ebay"] == pytest.approx(0.002)
+    assert trace.spans["parse"] >= 0.008
+
+
+def test_sdk_execute_without_a_response_counts_as_transport():
+    with profiling.profile("scan", sampled=False) as trace:
+        with pytest.raises(requests.Timeout):
+            scout.sdk_execute(FakeApi(error=requests.Timeout()), "findItemsAdvanced", {})
+    assert trace.counts["ebay"] == 1 and "parse" not in trace.spans
@@ -0,0 +1,55 @@
+import pytest
+
+from src.watchlist import RuleError, RuleIndex, make_rule
+
+
+def names(index, title, **kwargs):
+    return sorted(rule.name for rule in index.match(title, **kwargs))
+
+
+def test_exact_keywords_need_every_word():
+    index = RuleIndex([make_rule(1, "canon lens", "canon 50mm")])
+    assert names(index, "Canon EF 50mm f/1.8 lens") == ["canon lens"]
+    assert names(index, "Canon EF 85mm lens") == []
+    # Exact keywords don't match longer words
+    assert names(index, "Canonet 50mmx") == []
+
+
+def test_prefix_keyword():
+    index = RuleIndex([make_rule(1, "any nintendo", "nintend*")])
+    assert names(index, "Nintendo Switch OLED") == ["any nintendo"]
+    assert names(index, "NINTENDO64 console") == ["any nintendo"]
+    assert names(index, "Sega Genesis") == []
+
+
+def test_category_rule_without_keywords():
+    index = RuleIndex([make_rule(1, "cameras", category_id="625")])
+    assert names(index, "Anything at all", category_id="625") == ["cameras"]
+    assert names(index, "Anything at all", category_id="9355") == []
+
+
+def test_keyword_rule_is_restricted_to_its_category():
+    index = RuleIndex([make_rule(1, "lego in toys", "lego", category_id="220")])
+    assert names(index, "Lego Millennium Falcon", category_id="220") == ["lego in toys"]
+    assert names(index, "Lego Millennium Falcon", category_id="1") == []
+
+
+def test_catch_all_rule_checks_price_ratio_and_condition():
+    index = RuleIndex([
+        make_rule(1, "cheap", max_price=20),
+        make_rule(2, "half price", ratio=0.5),
+        make_rule(3, "new only", condition="New"),
+    ])
+    assert names(index, "Widget", price=15, comp_avg=100, condition="Used") == ["cheap", "half price"]
+    assert names(index, "Widget", price=60, comp_avg=100, condition="new") == ["new only"]
+    # A ratio rule needs comps to compare against
+    assert names(index, "Widget", price=60, comp_avg=None, condition="Used") == []
+
+
+def test_rules_matching_everything_are_rejected():
+    with pytest.raises(RuleError):
+        make_rule(1, "nothing")
+    with pytest.raises(RuleError):
+        make_rule(1, "stars", "*")
+    with pytest.raises(RuleError):
+        make_rule(1, "punctuation", "!!!", max_price=10)